@@ -0,0 +1,41 @@
+import os
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+from model import Logger
+from record import BinaryFormat
+from sink import ConsoleSink, AsyncSink
+
+
+def log_burst(logger: Logger, count: int) -> float:
+    start = time.perf_counter()
+    for index in range(count):
+        logger.log_transfer("0001", "0002", index)
+    return count / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    logger = Logger.get_instance()
+    with tempfile.TemporaryDirectory() as directory:
+        # line buffering makes every print its own write, as it is for stdout on a terminal
+        with open(os.path.join(directory, "print.log"), "w", buffering=1) as stream, redirect_stdout(stream):
+            logger.set_sink(ConsoleSink())
+            print_rate = log_burst(logger, count)
+        with open(os.path.join(directory, "async.log"), "w", buffering=1) as stream:
+            logger.set_sink(AsyncSink(stream))
+            async_rate = log_burst(logger, count)
+            start = time.perf_counter()
+            logger.flush()
+            drain_seconds = time.perf_counter() - start
+            logger.set_sink(ConsoleSink())
+        with open(os.path.join(directory, "audit.bin"), "wb") as stream:
+            logger.set_sink(AsyncSink(stream, record_format=BinaryFormat()))
+            binary_rate = log_burst(logger, count)
+            logger.set_sink(ConsoleSink())
+    print(f"{count:,} transfer records")
+    print(f"  print      {print_rate:12,.0f} calls/s")
+    print(f"  async sink {async_rate:12,.0f} calls/s (flush afterwards took {drain_seconds * 1000:.1f} ms)")
+    print(f"  async bin  {binary_rate:12,.0f} calls/s")
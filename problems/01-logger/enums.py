@@ -0,0 +1,13 @@
+from enum import Enum
+
+
+class BackPressurePolicy(Enum):
+    BLOCK = "BLOCK"
+    DROP_OLDEST = "DROP_OLDEST"
+    DROP_NEWEST = "DROP_NEWEST"
+
+
+class EventType(Enum):
+    WITHDRAW = "Withdraw"
+    DEPOSIT = "Deposit"
+    TRANSFER = "Transfer"
@@ -1,4 +1,4 @@
-from problems.logger.model import Logger
+from model import Logger
 
 if __name__ == '__main__':
     logger_1 = Logger.get_instance()
@@ -1,23 +1,84 @@
+import threading
+import time
+
+from enums import EventType
+from record import LogRecord
+from sink import LogSink, ConsoleSink
+from throttle import LogThrottle, NANOSECONDS
+
+
 class Logger:
     _instance = None
+    _lock = threading.Lock()
 
     @classmethod
     def get_instance(cls):
+        # double-checked: once the instance exists no caller takes the lock
         if cls._instance is None:
-            cls()
+            with cls._lock:
+                if cls._instance is None:
+                    cls()
         return cls._instance
 
     def __init__(self):
         if Logger._instance is not None:
             raise Exception("Instance already exists")
         else:
+            self.sink: LogSink = ConsoleSink()
+            self.throttle: LogThrottle = None
+            self.summaries_stopped = threading.Event()
             Logger._instance = self
 
+    def set_sink(self, sink: LogSink):
+        previous, self.sink = self.sink, sink
+        previous.close()
+
+    def set_throttle(self, throttle: LogThrottle):
+        self.emit_summaries()
+        self.summaries_stopped.set()
+        self.throttle = throttle
+        if throttle is not None:
+            self.summaries_stopped = threading.Event()
+            threading.Thread(target=self.summarize, args=(throttle, self.summaries_stopped), daemon=True).start()
+
     def log_withdraw(self, account: str, amount: float):
-        print(f"Withdraw {account}: {amount}")
+        self.emit(LogRecord(EventType.WITHDRAW, account, None, amount, time.monotonic_ns()))
 
     def log_deposit(self, account: str, amount: float):
-        print(f"Deposit {account}: {amount}")
+        self.emit(LogRecord(EventType.DEPOSIT, account, None, amount, time.monotonic_ns()))
 
     def log_transfer(self, sender_account: str, receiver_account: str, amount: float):
-        print(f"Transfer from {sender_account} to {receiver_account}: {amount}")
+        self.emit(LogRecord(EventType.TRANSFER, sender_account, receiver_account, amount, time.monotonic_ns()))
+
+    def emit(self, record: LogRecord):
+        throttle = self.throttle
+        if throttle is not None:
+            if throttle.summary_due(record.timestamp):
+                self.emit_summaries()
+            if not throttle.admit(record):
+                return
+        self.sink.emit(record)
+
+    def summarize(self, throttle: LogThrottle, stopped: threading.Event):
+        # emit() only checks for due summaries when a record arrives, this covers a burst followed by silence
+        while True:
+            next_summary_at = throttle.next_summary_at
+            delay = throttle.summary_interval if next_summary_at is None else next_summary_at - time.monotonic_ns()
+            if stopped.wait(max(delay, 0) / NANOSECONDS):
+                return
+            if throttle.summary_due(time.monotonic_ns()):
+                self.emit_summaries()
+
+    def emit_summaries(self):
+        if self.throttle is not None:
+            for summary in self.throttle.drain_summaries(time.monotonic_ns()):
+                self.sink.emit(summary)
+
+    def flush(self):
+        self.emit_summaries()
+        self.sink.flush()
+
+    def shutdown(self):
+        self.summaries_stopped.set()
+        self.emit_summaries()
+        self.sink.close()
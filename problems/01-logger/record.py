@@ -0,0 +1,92 @@
+import json
+import struct
+from abc import ABC, abstractmethod
+from typing import Iterator, List
+
+from enums import EventType
+
+
+def abbreviate(amount: float) -> str:
+    for threshold, suffix in ((1e9, "B"), (1e6, "M"), (1e3, "K")):
+        if abs(amount) >= threshold:
+            return f"{amount / threshold:.1f}{suffix}"
+    return f"{amount:g}"
+
+
+class LogRecord:
+    __slots__ = ("event_type", "account", "receiver_account", "amount", "timestamp", "suppressed")
+
+    def __init__(self, event_type: EventType, account: str, receiver_account: str, amount: float,
+                 timestamp: int, suppressed: int = 0):
+        self.event_type = event_type
+        self.account = account
+        self.receiver_account = receiver_account
+        self.amount = amount
+        # time.monotonic_ns() at the call site, formatting happens later in the sink
+        self.timestamp = timestamp
+        # non-zero for a throttling rollup: how many records it stands for, amount is their total
+        self.suppressed = suppressed
+
+    def format(self) -> str:
+        if self.suppressed:
+            return (f"account {self.account}: {self.suppressed:,} {self.event_type.value.lower()}s suppressed, "
+                    f"total {abbreviate(self.amount)}")
+        if self.event_type == EventType.TRANSFER:
+            return f"Transfer from {self.account} to {self.receiver_account}: {self.amount}"
+        return f"{self.event_type.value} {self.account}: {self.amount}"
+
+
+class RecordFormat(ABC):
+    @abstractmethod
+    def encode(self, records: List[LogRecord]):
+        pass
+
+    def decode(self, data) -> Iterator[LogRecord]:
+        raise Exception(f"{type(self).__name__} records cannot be read back")
+
+
+class TextFormat(RecordFormat):
+    def encode(self, records: List[LogRecord]) -> str:
+        return "".join([record.format() + "\n" for record in records])
+
+
+class JsonLinesFormat(RecordFormat):
+    def encode(self, records: List[LogRecord]) -> str:
+        lines = []
+        for record in records:
+            entry = {"event": record.event_type.name, "timestamp": record.timestamp,
+                     "account": record.account, "amount": record.amount}
+            if record.receiver_account is not None:
+                entry["receiver_account"] = record.receiver_account
+            if record.suppressed:
+                entry["suppressed"] = record.suppressed
+            lines.append(json.dumps(entry, separators=(",", ":")) + "\n")
+        return "".join(lines)
+
+    def decode(self, data) -> Iterator[LogRecord]:
+        for line in bytes(data).decode().splitlines():
+            entry = json.loads(line)
+            yield LogRecord(EventType[entry["event"]], entry["account"], entry.get("receiver_account"),
+                            entry["amount"], entry["timestamp"], entry.get("suppressed", 0))
+
+
+class BinaryFormat(RecordFormat):
+    # event code, monotonic ns, two NUL-padded 16-byte account ids, amount, suppressed count;
+    # 53 bytes per record. Account ids longer than 16 bytes are truncated.
+    LAYOUT = struct.Struct("<BQ16s16sdI")
+    EVENT_CODES = {event_type: code for code, event_type in enumerate(EventType)}
+    EVENT_TYPES = list(EventType)
+
+    def encode(self, records: List[LogRecord]) -> bytes:
+        pack = self.LAYOUT.pack
+        return b"".join([pack(self.EVENT_CODES[record.event_type], record.timestamp,
+                              record.account.encode(),
+                              (record.receiver_account or "").encode(),
+                              record.amount, record.suppressed)
+                         for record in records])
+
+    def decode(self, data) -> Iterator[LogRecord]:
+        for code, timestamp, account, receiver_account, amount, suppressed in self.LAYOUT.iter_unpack(data):
+            receiver_account = receiver_account.rstrip(b"\0").decode()
+            yield LogRecord(self.EVENT_TYPES[code], account.rstrip(b"\0").decode(),
+                            receiver_account or None, amount, timestamp, suppressed)
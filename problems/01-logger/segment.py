@@ -0,0 +1,111 @@
+import mmap
+import os
+import struct
+import time
+from typing import Iterator, List
+
+from record import LogRecord, RecordFormat
+
+CHUNK_HEADER = struct.Struct("<I")
+SEGMENT_PREFIX = "segment-"
+SEGMENT_SUFFIX = ".log"
+
+
+def list_segments(directory: str) -> List[str]:
+    names = [name for name in os.listdir(directory)
+             if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX)]
+    return [os.path.join(directory, name) for name in sorted(names)]
+
+
+class SegmentWriter:
+    # Writes length-prefixed chunks into preallocated, memory-mapped segment files.
+    # A zero length prefix marks the end of the data, so a segment left behind by a crash
+    # (still padded with zeros) reads back correctly.
+    def __init__(self, directory: str, segment_size: int = 64 * 1024 * 1024, rotate_interval: float = None,
+                 fsync_interval: float = 1.0, clock=time.monotonic):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.segment_size = segment_size
+        self.rotate_interval = rotate_interval
+        self.fsync_interval = fsync_interval
+        self.clock = clock
+        existing = list_segments(directory)
+        self.segment_index = int(os.path.basename(existing[-1])[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]) \
+            if existing else 0
+        self.file = None
+        self.map = None
+        self.offset = 0
+        self.opened_at = 0.0
+        self.synced_at = 0.0
+
+    def write(self, data):
+        if isinstance(data, str):
+            data = data.encode()
+        needed = CHUNK_HEADER.size + len(data)
+        now = self.clock()
+        if self.map is None or self.offset + needed > len(self.map) or \
+                (self.rotate_interval is not None and now - self.opened_at >= self.rotate_interval):
+            self.rotate(needed, now)
+        CHUNK_HEADER.pack_into(self.map, self.offset, len(data))
+        self.map[self.offset + CHUNK_HEADER.size:self.offset + needed] = data
+        self.offset += needed
+        if self.fsync_interval is not None and now - self.synced_at >= self.fsync_interval:
+            self.map.flush()
+            self.synced_at = now
+
+    def rotate(self, needed: int, now: float):
+        self.close_segment()
+        self.segment_index += 1
+        path = os.path.join(self.directory, f"{SEGMENT_PREFIX}{self.segment_index:08d}{SEGMENT_SUFFIX}")
+        # a chunk bigger than a whole segment gets a segment of its own
+        size = max(self.segment_size, needed)
+        self.file = open(path, "w+b")
+        self.file.truncate(size)
+        self.map = mmap.mmap(self.file.fileno(), size)
+        self.offset = 0
+        self.opened_at = now
+        self.synced_at = now
+
+    def close_segment(self):
+        if self.map is None:
+            return
+        self.map.flush()
+        self.map.close()
+        # drop the unused preallocated tail
+        self.file.truncate(self.offset)
+        os.fsync(self.file.fileno())
+        self.file.close()
+        self.map = None
+        self.file = None
+
+    def flush(self):
+        if self.map is not None:
+            self.map.flush()
+            self.synced_at = self.clock()
+
+    def close(self):
+        self.close_segment()
+
+
+class SegmentReader:
+    def __init__(self, directory: str, record_format: RecordFormat):
+        self.directory = directory
+        self.record_format = record_format
+
+    def __iter__(self) -> Iterator[LogRecord]:
+        for path in list_segments(self.directory):
+            yield from self.read_segment(path)
+
+    def read_segment(self, path: str) -> Iterator[LogRecord]:
+        with open(path, "rb") as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as segment:
+                offset = 0
+                while offset + CHUNK_HEADER.size <= len(segment):
+                    (length,) = CHUNK_HEADER.unpack_from(segment, offset)
+                    if length == 0:
+                        break
+                    start = offset + CHUNK_HEADER.size
+                    yield from self.record_format.decode(segment[start:start + length])
+                    offset = start + length
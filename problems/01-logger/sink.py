@@ -0,0 +1,142 @@
+import atexit
+import sys
+import threading
+from abc import ABC, abstractmethod
+from collections import deque
+
+from enums import BackPressurePolicy
+from record import LogRecord, RecordFormat, TextFormat, JsonLinesFormat, BinaryFormat
+from segment import SegmentWriter
+
+
+class LogSink(ABC):
+    @abstractmethod
+    def emit(self, record: LogRecord):
+        pass
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class ConsoleSink(LogSink):
+    def emit(self, record: LogRecord):
+        print(record.format())
+
+
+class StreamSink(LogSink):
+    def __init__(self, stream, record_format: RecordFormat):
+        self.stream = stream
+        self.record_format = record_format
+
+    def emit(self, record: LogRecord):
+        self.stream.write(self.record_format.encode([record]))
+
+    def flush(self):
+        self.stream.flush()
+
+
+class JsonLinesSink(StreamSink):
+    def __init__(self, stream):
+        super().__init__(stream, JsonLinesFormat())
+
+
+class BinarySink(StreamSink):
+    def __init__(self, stream):
+        super().__init__(stream, BinaryFormat())
+
+
+class MmapFileSink(StreamSink):
+    def __init__(self, directory: str, record_format: RecordFormat = None, segment_size: int = 64 * 1024 * 1024,
+                 rotate_interval: float = None, fsync_interval: float = 1.0):
+        super().__init__(SegmentWriter(directory, segment_size, rotate_interval, fsync_interval),
+                         record_format if record_format is not None else BinaryFormat())
+        self.lock = threading.Lock()
+
+    def emit(self, record: LogRecord):
+        with self.lock:
+            self.stream.write(self.record_format.encode([record]))
+
+    def flush(self):
+        with self.lock:
+            self.stream.flush()
+
+    def close(self):
+        with self.lock:
+            self.stream.close()
+
+
+class AsyncSink(LogSink):
+    def __init__(self, stream=None, capacity: int = 8192, batch_size: int = 512,
+                 back_pressure: BackPressurePolicy = BackPressurePolicy.BLOCK,
+                 record_format: RecordFormat = None):
+        self.stream = stream if stream is not None else sys.stdout
+        self.record_format = record_format if record_format is not None else TextFormat()
+        self.batch_size = batch_size
+        self.back_pressure = back_pressure
+        self.buffer = deque(maxlen=capacity)
+        self.condition = threading.Condition()
+        # records accepted but not yet written, including the batch the writer is holding
+        self.pending = 0
+        self.dropped = 0
+        self.closed = False
+        self.writer = threading.Thread(target=self.drain, daemon=True)
+        self.writer.start()
+        atexit.register(self.close)
+
+    def emit(self, record: LogRecord):
+        with self.condition:
+            if self.closed:
+                raise Exception("Sink is closed")
+            if len(self.buffer) == self.buffer.maxlen:
+                if self.back_pressure == BackPressurePolicy.DROP_NEWEST:
+                    self.dropped += 1
+                    return
+                if self.back_pressure == BackPressurePolicy.DROP_OLDEST:
+                    # the full deque discards its oldest record on append
+                    self.dropped += 1
+                    self.pending -= 1
+                else:
+                    while len(self.buffer) == self.buffer.maxlen:
+                        self.condition.wait()
+                        # the writer may have drained and exited while this producer waited
+                        if self.closed:
+                            raise Exception("Sink is closed")
+            self.buffer.append(record)
+            self.pending += 1
+            if len(self.buffer) == 1:
+                self.condition.notify_all()
+
+    def drain(self):
+        while True:
+            with self.condition:
+                while not self.buffer and not self.closed:
+                    self.condition.wait()
+                if not self.buffer:
+                    return
+                count = min(len(self.buffer), self.batch_size)
+                batch = [self.buffer.popleft() for _ in range(count)]
+                self.condition.notify_all()
+            self.stream.write(self.record_format.encode(batch))
+            with self.condition:
+                self.pending -= count
+                if not self.pending:
+                    self.condition.notify_all()
+
+    def flush(self):
+        with self.condition:
+            while self.pending:
+                self.condition.wait()
+        self.stream.flush()
+
+    def close(self):
+        with self.condition:
+            if self.closed:
+                return
+            self.closed = True
+            self.condition.notify_all()
+        self.writer.join()
+        self.stream.flush()
+        atexit.unregister(self.close)
@@ -0,0 +1,36 @@
+import sys
+import threading
+
+from model import Logger
+
+
+def race(thread_count: int) -> set:
+    Logger._instance = None
+    barrier = threading.Barrier(thread_count)
+    instances = []
+    errors = []
+
+    def create():
+        barrier.wait()
+        try:
+            instances.append(Logger.get_instance())
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=create) for _ in range(thread_count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+    return {id(instance) for instance in instances}
+
+
+if __name__ == "__main__":
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    # switch threads as often as possible so the check-then-create window is actually contended
+    sys.setswitchinterval(1e-6)
+    for _ in range(rounds):
+        assert len(race(64)) == 1, "threads saw different Logger instances"
+    print(f"{rounds} rounds x 64 threads: one Logger instance per round, no creation errors")
@@ -0,0 +1,84 @@
+import threading
+from typing import Dict, List, Tuple
+
+from enums import EventType
+from record import LogRecord
+
+NANOSECONDS = 1_000_000_000
+
+
+class AccountState:
+    __slots__ = ("tokens", "refilled_at", "seen", "last_seen_at")
+
+    def __init__(self, tokens: float, refilled_at: int):
+        self.tokens = tokens
+        self.refilled_at = refilled_at
+        self.seen = 0
+        self.last_seen_at = refilled_at
+
+
+class Suppression:
+    __slots__ = ("count", "total")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+
+
+class LogThrottle:
+    # Per-account sampling (keep one record in sample_every) followed by a token bucket of
+    # `rate` records per second with room for `burst`. Everything dropped is folded into a
+    # per (account, event) counter and reported as one rollup record every summary_interval.
+    # An account quiet for a whole interval with a full bucket is forgotten when summaries are drained.
+    def __init__(self, rate: float, burst: int, sample_every: int = 1, summary_interval: float = 10.0):
+        self.rate = rate / NANOSECONDS
+        self.burst = burst
+        self.sample_every = sample_every
+        self.summary_interval = int(summary_interval * NANOSECONDS)
+        self.accounts: Dict[str, AccountState] = dict()
+        self.suppressions: Dict[Tuple[str, EventType], Suppression] = dict()
+        self.next_summary_at = None
+        self.lock = threading.Lock()
+
+    def admit(self, record: LogRecord) -> bool:
+        now = record.timestamp
+        with self.lock:
+            if self.next_summary_at is None:
+                self.next_summary_at = now + self.summary_interval
+            state = self.accounts.get(record.account)
+            if state is None:
+                state = self.accounts[record.account] = AccountState(self.burst, now)
+            state.seen += 1
+            state.last_seen_at = now
+            if state.seen % self.sample_every == 0:
+                state.tokens = min(self.burst, state.tokens + (now - state.refilled_at) * self.rate)
+                state.refilled_at = now
+                if state.tokens >= 1:
+                    state.tokens -= 1
+                    return True
+            key = (record.account, record.event_type)
+            suppression = self.suppressions.get(key)
+            if suppression is None:
+                suppression = self.suppressions[key] = Suppression()
+            suppression.count += 1
+            suppression.total += record.amount
+            return False
+
+    def summary_due(self, now: int) -> bool:
+        return self.next_summary_at is not None and now >= self.next_summary_at
+
+    def drain_summaries(self, now: int) -> List[LogRecord]:
+        with self.lock:
+            suppressions, self.suppressions = self.suppressions, dict()
+            self.next_summary_at = now + self.summary_interval
+            self.forget_idle_accounts(now)
+        return [LogRecord(event_type, account, None, suppression.total, now, suppression.count)
+                for (account, event_type), suppression in suppressions.items()]
+
+    def forget_idle_accounts(self, now: int):
+        # a new AccountState starts with a full bucket, so forgetting one that has refilled only restarts its sampling count
+        idle = [account for account, state in self.accounts.items()
+                if now - state.last_seen_at >= self.summary_interval
+                and state.tokens + (now - state.refilled_at) * self.rate >= self.burst]
+        for account in idle:
+            del self.accounts[account]
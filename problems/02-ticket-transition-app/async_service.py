@@ -0,0 +1,64 @@
+import asyncio
+from typing import Awaitable, Callable, Iterable, List, Set
+
+from model import User, Ticket
+from enums import TicketState
+from service import TicketService
+
+TransitionHook = Callable[[Ticket, TicketState, TicketState], Awaitable[None]]
+
+
+class AsyncTicketService:
+    def __init__(self, ticket_service: TicketService = None, hook_concurrency: int = 16):
+        self.ticket_service = ticket_service if ticket_service is not None else TicketService()
+        self.hooks: List[TransitionHook] = []
+        self.hook_slots = asyncio.Semaphore(hook_concurrency)
+        self.pending_hooks: Set[asyncio.Task] = set()
+
+    def add_hook(self, hook: TransitionHook):
+        self.hooks.append(hook)
+
+    async def create_ticket(self, desc: str, user: User) -> Ticket:
+        return self.ticket_service.create_ticket(desc, user)
+
+    async def start_analysis(self, ticket: Ticket) -> bool:
+        return await self.transition(ticket, TicketState.ANALYSIS)
+
+    async def start_review(self, ticket: Ticket) -> bool:
+        return await self.transition(ticket, TicketState.REVIEW)
+
+    async def mark_done(self, ticket: Ticket) -> bool:
+        return await self.transition(ticket, TicketState.DONE)
+
+    async def transition(self, ticket: Ticket, ticket_state: TicketState) -> bool:
+        # the critical section is synchronous and never awaits; hooks are only scheduled once it is over
+        previous_state = self.ticket_service.apply_transition(ticket, ticket_state)
+        if previous_state is None:
+            return False
+        self.dispatch(ticket, previous_state.ticket_state, ticket_state)
+        return True
+
+    async def bulk_transition(self, tickets: Iterable[Ticket], ticket_state: TicketState) -> List[Ticket]:
+        moved = []
+        rejected = self.ticket_service.bulk_transition(tickets, ticket_state, moved)
+        for ticket, previous_state in moved:
+            self.dispatch(ticket, previous_state.ticket_state, ticket_state)
+        return rejected
+
+    def dispatch(self, ticket: Ticket, previous_state: TicketState, ticket_state: TicketState):
+        for hook in self.hooks:
+            task = asyncio.get_running_loop().create_task(self.run_hook(hook, ticket, previous_state, ticket_state))
+            self.pending_hooks.add(task)
+            task.add_done_callback(self.pending_hooks.discard)
+
+    async def run_hook(self, hook: TransitionHook, ticket: Ticket, previous_state: TicketState,
+                       ticket_state: TicketState):
+        async with self.hook_slots:
+            try:
+                await hook(ticket, previous_state, ticket_state)
+            except Exception as error:
+                print(f"Hook {getattr(hook, '__name__', hook)} failed for {ticket.get_description()}: {error}")
+
+    async def drain_hooks(self):
+        while self.pending_hooks:
+            await asyncio.gather(*self.pending_hooks)
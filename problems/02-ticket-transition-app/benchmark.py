@@ -0,0 +1,40 @@
+import sys
+import threading
+import time
+
+from service import TicketService
+from model import User
+from enums import TicketState
+
+
+def worker(ticket_service: TicketService, tickets, barrier: threading.Barrier):
+    barrier.wait()
+    for ticket in tickets:
+        ticket_service.transition(ticket, TicketState.REVIEW)
+        ticket_service.transition(ticket, TicketState.DONE)
+
+
+def run(lock_stripes: int, ticket_count: int, thread_count: int) -> float:
+    ticket_service = TicketService(lock_stripes)
+    user = User("User 1")
+    tickets = [ticket_service.create_ticket(f"Ticket {index}", user) for index in range(ticket_count)]
+    barrier = threading.Barrier(thread_count + 1)
+    threads = [threading.Thread(target=worker, args=(ticket_service, tickets[index::thread_count], barrier))
+               for index in range(thread_count)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - start
+    assert all(ticket.get_state().ticket_state == TicketState.DONE for ticket in tickets)
+    return ticket_count * 2 / seconds
+
+
+if __name__ == "__main__":
+    thread_count = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    ticket_count = 100_000
+    print(f"{ticket_count:,} tickets Analysis -> Review -> Done on {thread_count} threads")
+    for lock_stripes in (1, 16, 64, 256):
+        print(f"  {lock_stripes:>3} lock stripes {run(lock_stripes, ticket_count, thread_count):12,.0f} transitions/s")
@@ -0,0 +1,45 @@
+from typing import Callable, Dict, Iterable, List
+
+from model import Ticket, State, Analysis, Review, Done
+from enums import TicketState, ALLOWED_TRANSITIONS
+
+
+class TransitionEngine:
+    def __init__(self):
+        states = [Analysis.get_instance(), Review.get_instance(), Done.get_instance()]
+        self.states: Dict[TicketState, State] = {state.ticket_state: state for state in states}
+        self.columns: Dict[TicketState, int] = {ticket_state: column for column, ticket_state in enumerate(TicketState)}
+        # rows are keyed by the State singletons themselves, so a lookup hashes by identity;
+        # a cell holds the State to move to, or None when the transition is not allowed
+        self.table: Dict[State, List[State]] = dict()
+        for state in states:
+            row = [None] * len(self.columns)
+            for target in ALLOWED_TRANSITIONS[state.ticket_state]:
+                row[self.columns[target]] = self.states[target]
+            self.table[state] = row
+
+    def next_state(self, ticket: Ticket, target: TicketState) -> State:
+        return self.table[ticket.state][self.columns[target]]
+
+    def transition(self, ticket: Ticket, target: TicketState) -> bool:
+        next_state = self.table[ticket.state][self.columns[target]]
+        if next_state is None:
+            return False
+        ticket.set_ticket_state(next_state)
+        return True
+
+    def bulk_transition(self, tickets: Iterable[Ticket], target: TicketState,
+                        on_transition: Callable[[Ticket, State], None] = None) -> List[Ticket]:
+        column = self.columns[target]
+        table = self.table
+        rejected = []
+        for ticket in tickets:
+            previous_state = ticket.state
+            next_state = table[previous_state][column]
+            if next_state is None:
+                rejected.append(ticket)
+            else:
+                ticket.state = next_state
+                if on_transition is not None:
+                    on_transition(ticket, previous_state)
+        return rejected
@@ -5,3 +5,11 @@ class TicketState(Enum):
     ANALYSIS = "Analysis"
     REVIEW = "Review"
     DONE = "Done"
+
+
+# target states reachable from each state, mirrors the State subclasses in model.py
+ALLOWED_TRANSITIONS = {
+    TicketState.ANALYSIS: (TicketState.REVIEW,),
+    TicketState.REVIEW: (TicketState.ANALYSIS, TicketState.DONE),
+    TicketState.DONE: (TicketState.ANALYSIS, TicketState.REVIEW),
+}
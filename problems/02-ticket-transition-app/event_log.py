@@ -0,0 +1,163 @@
+import os
+import struct
+import threading
+import time
+from typing import Dict, Iterator, Tuple
+
+from enums import TicketState
+
+# every record is a u32 length prefix followed by the payload, so the payload can grow
+# new fields later and a torn final record is detectable
+LENGTH = struct.Struct("<I")
+# ticket id, from-state code, to-state code, wall-clock ns
+TRANSITION = struct.Struct("<QBBq")
+# snapshot header: log offset the snapshot covers, ticket count; followed by (ticket id, state code) pairs
+SNAPSHOT_HEADER = struct.Struct("<QQ")
+SNAPSHOT_ENTRY = struct.Struct("<QB")
+
+STATES = list(TicketState)
+STATE_CODES = {ticket_state: code for code, ticket_state in enumerate(STATES)}
+CREATED = 0xFF
+
+LOG_NAME = "transitions.log"
+SNAPSHOT_PREFIX = "snapshot-"
+
+
+class EventLog:
+    def __init__(self, directory: str, snapshot_every: int = 1_000_000):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.snapshot_every = snapshot_every
+        self.lock = threading.Lock()
+        # the compacted view the next snapshot is cut from: ticket id -> state code
+        self.states, offset = recover_codes(directory)
+        self.file = open(os.path.join(directory, LOG_NAME), "ab")
+        # drop a torn record left by a crash so new records start on a boundary
+        self.file.truncate(offset)
+        self.offset = offset
+        self.since_snapshot = 0
+        # snapshots are written outside self.lock, one at a time, and only ever move forward
+        self.snapshot_lock = threading.Lock()
+        self.snapshot_offset = -1
+        self.snapshotter: threading.Thread = None
+
+    def append(self, ticket_id: int, previous_state: TicketState, ticket_state: TicketState,
+               timestamp: int = None):
+        from_code = CREATED if previous_state is None else STATE_CODES[previous_state]
+        to_code = STATE_CODES[ticket_state]
+        payload = TRANSITION.pack(ticket_id, from_code, to_code, timestamp if timestamp is not None else time.time_ns())
+        with self.lock:
+            self.file.write(LENGTH.pack(len(payload)) + payload)
+            self.offset += LENGTH.size + len(payload)
+            self.states[ticket_id] = to_code
+            self.since_snapshot += 1
+            if self.since_snapshot >= self.snapshot_every and self.snapshotter is None:
+                # only the copy happens here; encoding and fsyncing it would stall every transition
+                states, offset = self.cut_snapshot()
+                self.snapshotter = threading.Thread(target=self.write_in_background, args=(states, offset))
+                self.snapshotter.start()
+
+    def cut_snapshot(self) -> Tuple[Dict[int, int], int]:
+        # called with self.lock held, so the copy and the offset describe the same point in the log
+        self.file.flush()
+        self.since_snapshot = 0
+        return dict(self.states), self.offset
+
+    def write_in_background(self, states: Dict[int, int], offset: int):
+        try:
+            self.write_snapshot(states, offset)
+        finally:
+            with self.lock:
+                self.snapshotter = None
+
+    def write_snapshot(self, states: Dict[int, int], offset: int):
+        with self.snapshot_lock:
+            if offset <= self.snapshot_offset:
+                return
+            # the log must be durable up to the offset before a snapshot claiming it becomes visible
+            os.fsync(self.file.fileno())
+            path = os.path.join(self.directory, f"{SNAPSHOT_PREFIX}{offset:016d}")
+            with open(path + ".tmp", "wb") as file:
+                file.write(SNAPSHOT_HEADER.pack(offset, len(states)))
+                pack = SNAPSHOT_ENTRY.pack
+                file.write(b"".join([pack(ticket_id, code) for ticket_id, code in states.items()]))
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(path + ".tmp", path)
+            for name in os.listdir(self.directory):
+                if name.startswith(SNAPSHOT_PREFIX) and os.path.join(self.directory, name) != path:
+                    os.remove(os.path.join(self.directory, name))
+            self.snapshot_offset = offset
+
+    def snapshot(self):
+        with self.lock:
+            states, offset = self.cut_snapshot()
+        self.write_snapshot(states, offset)
+
+    def wait_for_snapshot(self):
+        with self.lock:
+            snapshotter = self.snapshotter
+        if snapshotter is not None:
+            snapshotter.join()
+
+    def flush(self):
+        with self.lock:
+            self.file.flush()
+
+    def close(self):
+        self.wait_for_snapshot()
+        with self.lock:
+            self.file.close()
+
+
+def latest_snapshot(directory: str) -> str:
+    names = sorted(name for name in os.listdir(directory)
+                   if name.startswith(SNAPSHOT_PREFIX) and not name.endswith(".tmp"))
+    return os.path.join(directory, names[-1]) if names else None
+
+
+def read_snapshot(path: str) -> Tuple[Dict[int, int], int]:
+    with open(path, "rb") as file:
+        data = file.read()
+    offset, count = SNAPSHOT_HEADER.unpack_from(data)
+    entries = SNAPSHOT_ENTRY.iter_unpack(memoryview(data)[SNAPSHOT_HEADER.size:])
+    return dict(entries), offset
+
+
+def read_transitions(directory: str, offset: int = 0,
+                     chunk_size: int = 16 * 1024 * 1024) -> Iterator[Tuple[int, Tuple[int, int, int, int]]]:
+    # yields (offset just past the record, (ticket id, from code, to code, timestamp)) and stops
+    # at a torn final record
+    path = os.path.join(directory, LOG_NAME)
+    if not os.path.exists(path):
+        return
+    with open(path, "rb") as file:
+        file.seek(offset)
+        data = b""
+        while True:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                return
+            data = data[position:] + chunk if data else chunk
+            position = 0
+            while position + LENGTH.size <= len(data):
+                (length,) = LENGTH.unpack_from(data, position)
+                end = position + LENGTH.size + length
+                if end > len(data):
+                    break
+                offset += end - position
+                position = end
+                yield offset, TRANSITION.unpack_from(data, end - length)
+
+
+def recover_codes(directory: str) -> Tuple[Dict[int, int], int]:
+    snapshot = latest_snapshot(directory)
+    states, offset = read_snapshot(snapshot) if snapshot else (dict(), 0)
+    for offset, (ticket_id, _, to_code, _) in read_transitions(directory, offset):
+        states[ticket_id] = to_code
+    return states, offset
+
+
+def recover(directory: str) -> Dict[int, TicketState]:
+    states, _ = recover_codes(directory)
+    return {ticket_id: STATES[code] for ticket_id, code in states.items()}
@@ -1,3 +1,5 @@
+import itertools
+import threading
 from abc import ABC, abstractmethod
 
 from enums import TicketState
@@ -9,6 +11,8 @@ class User:
 
 
 class State(ABC):
+    ticket_state: TicketState = None
+
     @abstractmethod
     def start_analysis(self, ticket: 'Ticket') -> bool:
         pass
@@ -22,8 +26,18 @@ class State(ABC):
         pass
 
 
+ticket_ids = itertools.count(1)
+
+
+def reserve_ticket_ids(last_id: int):
+    # after recovering from the event log, new tickets must not reuse persisted ids
+    global ticket_ids
+    ticket_ids = itertools.count(last_id + 1)
+
+
 class Ticket:
     def __init__(self, description: str, user: 'User', state: 'State'):
+        self.id: int = next(ticket_ids)
         self.description = description
         self.user = user
         self.state = state
@@ -39,12 +53,16 @@ class Ticket:
 
 
 class Analysis(State):
+    ticket_state = TicketState.ANALYSIS
     _instance = None
+    _lock = threading.Lock()
 
     @classmethod
     def get_instance(cls):
         if cls._instance is None:
-            cls()
+            with cls._lock:
+                if cls._instance is None:
+                    cls()
         return cls._instance
 
     def __init__(self):
@@ -68,12 +86,16 @@ class Analysis(State):
 
 
 class Review(State):
+    ticket_state = TicketState.REVIEW
     _instance = None
+    _lock = threading.Lock()
 
     @classmethod
     def get_instance(cls):
         if cls._instance is None:
-            cls()
+            with cls._lock:
+                if cls._instance is None:
+                    cls()
         return cls._instance
 
     def __init__(self):
@@ -98,12 +120,16 @@ class Review(State):
 
 
 class Done(State):
+    ticket_state = TicketState.DONE
     _instance = None
+    _lock = threading.Lock()
 
     @classmethod
     def get_instance(cls):
         if cls._instance is None:
-            cls()
+            with cls._lock:
+                if cls._instance is None:
+                    cls()
         return cls._instance
 
     def __init__(self):
@@ -0,0 +1,43 @@
+import sys
+import tempfile
+import time
+
+from enums import TicketState
+from event_log import EventLog, recover, read_transitions
+
+PATH = [(None, TicketState.ANALYSIS), (TicketState.ANALYSIS, TicketState.REVIEW),
+        (TicketState.REVIEW, TicketState.DONE)]
+
+
+if __name__ == "__main__":
+    event_count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    ticket_count = event_count // len(PATH)
+    with tempfile.TemporaryDirectory() as directory:
+        event_log = EventLog(directory, snapshot_every=event_count // 10)
+        start = time.perf_counter()
+        # each ticket walks Analysis -> Review -> Done; passes are interleaved so the tail after
+        # the last snapshot touches tickets that the snapshot already holds
+        worst = 0.0
+        clock = time.perf_counter
+        for previous_state, ticket_state in PATH:
+            for ticket_id in range(1, ticket_count + 1):
+                before = clock()
+                event_log.append(ticket_id, previous_state, ticket_state)
+                worst = max(worst, clock() - before)
+        event_log.close()
+        append_seconds = time.perf_counter() - start
+        print(f"{ticket_count * len(PATH):,} events for {ticket_count:,} tickets, "
+              f"appended at {ticket_count * len(PATH) / append_seconds:,.0f} events/s, "
+              f"slowest append {worst * 1000:.1f} ms")
+
+        start = time.perf_counter()
+        states = dict()
+        for _, (ticket_id, _, to_code, _) in read_transitions(directory):
+            states[ticket_id] = to_code
+        print(f"  full replay          {time.perf_counter() - start:8.2f} s")
+
+        start = time.perf_counter()
+        recovered = recover(directory)
+        print(f"  snapshot + tail      {time.perf_counter() - start:8.2f} s")
+        assert len(recovered) == ticket_count
+        assert all(ticket_state == TicketState.DONE for ticket_state in recovered.values())
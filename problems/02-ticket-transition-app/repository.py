@@ -0,0 +1,79 @@
+import threading
+from typing import Dict, Iterator, List
+
+from model import Ticket, User, State, Analysis, Review, Done
+from enums import TicketState
+
+
+def paginate(tickets: Dict[int, Ticket], page_size: int) -> Iterator[List[Ticket]]:
+    # snapshot first, a dict cannot be iterated while other threads move tickets in and out of it
+    snapshot = list(tickets.values())
+    for start in range(0, len(snapshot), page_size):
+        yield snapshot[start:start + page_size]
+
+
+class TicketRepository:
+    # Callers hold the ticket's stripe lock around add/move, so a ticket is never moved by two
+    # threads at once and each per-ticket index update is a single dict operation. Tickets of one user
+    # can sit on different stripes though, so creating a user's buckets takes the repository lock.
+    # Indexes are keyed by the State singletons rather than TicketState, whose hash is computed
+    # in Python on every lookup.
+    def __init__(self):
+        self.states: Dict[TicketState, State] = {state.ticket_state: state for state in
+                                                 (Analysis.get_instance(), Review.get_instance(),
+                                                  Done.get_instance())}
+        self.tickets: Dict[int, Ticket] = dict()
+        self.by_state: Dict[State, Dict[int, Ticket]] = {state: dict() for state in self.states.values()}
+        self.by_user: Dict[User, Dict[State, Dict[int, Ticket]]] = dict()
+        self.lock = threading.Lock()
+
+    def add(self, ticket: Ticket):
+        state = ticket.get_state()
+        by_user = self.by_user.get(ticket.user)
+        if by_user is None:
+            with self.lock:
+                by_user = self.by_user.get(ticket.user)
+                if by_user is None:
+                    by_user = self.by_user[ticket.user] = {state: dict() for state in self.states.values()}
+        self.tickets[ticket.id] = ticket
+        self.by_state[state][ticket.id] = ticket
+        by_user[state][ticket.id] = ticket
+
+    def move(self, ticket: Ticket, previous_state: State):
+        state = ticket.get_state()
+        if state is previous_state:
+            return
+        by_user = self.by_user[ticket.user]
+        del self.by_state[previous_state][ticket.id]
+        del by_user[previous_state][ticket.id]
+        self.by_state[state][ticket.id] = ticket
+        by_user[state][ticket.id] = ticket
+
+    def get(self, ticket_id: int) -> Ticket:
+        return self.tickets.get(ticket_id)
+
+    def count_by_state(self, ticket_state: TicketState) -> int:
+        return len(self.by_state[self.states[ticket_state]])
+
+    def count_by_user(self, user: User, ticket_state: TicketState = None) -> int:
+        by_user = self.by_user.get(user)
+        if by_user is None:
+            return 0
+        if ticket_state is not None:
+            return len(by_user[self.states[ticket_state]])
+        return sum(len(tickets) for tickets in by_user.values())
+
+    def find_by_state(self, ticket_state: TicketState, page_size: int = 100) -> Iterator[List[Ticket]]:
+        return paginate(self.by_state[self.states[ticket_state]], page_size)
+
+    def find_by_user(self, user: User, ticket_state: TicketState = None,
+                     page_size: int = 100) -> Iterator[List[Ticket]]:
+        by_user = self.by_user.get(user)
+        if by_user is None:
+            return iter(())
+        if ticket_state is not None:
+            return paginate(by_user[self.states[ticket_state]], page_size)
+        tickets = dict()
+        for state_tickets in by_user.values():
+            tickets.update(state_tickets)
+        return paginate(tickets, page_size)
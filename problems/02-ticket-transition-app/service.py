@@ -1,33 +1,64 @@
-from model import User, Ticket, Review, Analysis, Done
+from collections import defaultdict
+from typing import Iterable, List, Tuple
+
+from model import User, Ticket, State, Review, Analysis, Done, reserve_ticket_ids
 from enums import TicketState
+from engine import TransitionEngine
+from repository import TicketRepository
+from event_log import EventLog
 import threading
 
 
 class TicketService:
 
-    def __init__(self):
-        self.lock = threading.Lock()
+    def __init__(self, lock_stripes: int = 64, event_log: EventLog = None):
+        # a ticket always maps to the same stripe, so unrelated tickets rarely contend
+        self.locks: List[threading.Lock] = [threading.Lock() for _ in range(lock_stripes)]
+        self.engine = TransitionEngine()
+        self.repository = TicketRepository()
+        self.event_log = event_log
+        if event_log is not None:
+            reserve_ticket_ids(max(event_log.states, default=0))
+
+    def lock_for(self, ticket: Ticket) -> threading.Lock:
+        return self.locks[hash(ticket) % len(self.locks)]
 
     def create_ticket(self, desc: str, user: User):
-        return Ticket(desc, user, Analysis.get_instance())
+        ticket = Ticket(desc, user, Analysis.get_instance())
+        with self.lock_for(ticket):
+            self.repository.add(ticket)
+            if self.event_log is not None:
+                self.event_log.append(ticket.id, None, ticket.get_state().ticket_state)
+        return ticket
+
+    def on_transition(self, ticket: Ticket, previous_state: State):
+        self.repository.move(ticket, previous_state)
+        if self.event_log is not None:
+            self.event_log.append(ticket.id, previous_state.ticket_state, ticket.get_state().ticket_state)
 
     def start_analysis(self, ticket: Ticket):
-        with self.lock:
-            is_feasible = ticket.get_state().start_analysis(ticket)
+        with self.lock_for(ticket):
+            previous_state = ticket.get_state()
+            is_feasible = previous_state.start_analysis(ticket)
             if is_feasible:
-                ticket.set_state(Analysis.get_instance())
+                ticket.set_ticket_state(Analysis.get_instance())
+                self.on_transition(ticket, previous_state)
 
     def start_review(self, ticket: Ticket):
-        with self.lock:
-            is_feasible = ticket.get_state().start_review(ticket)
+        with self.lock_for(ticket):
+            previous_state = ticket.get_state()
+            is_feasible = previous_state.start_review(ticket)
             if is_feasible:
-                ticket.set_state(Review.get_instance())
+                ticket.set_ticket_state(Review.get_instance())
+                self.on_transition(ticket, previous_state)
 
     def mark_done(self, ticket: Ticket):
-        with self.lock:
-            is_feasible = ticket.get_state().mark_done(ticket)
+        with self.lock_for(ticket):
+            previous_state = ticket.get_state()
+            is_feasible = previous_state.mark_done(ticket)
             if is_feasible:
-                ticket.set_state(Done.get_instance())
+                ticket.set_ticket_state(Done.get_instance())
+                self.on_transition(ticket, previous_state)
 
     def change_ticket_state(self, ticket: Ticket, ticket_state: TicketState):
         if ticket_state == TicketState.ANALYSIS:
@@ -36,3 +67,31 @@ class TicketService:
             self.start_review(ticket)
         else:
             self.mark_done(ticket)
+
+    def transition(self, ticket: Ticket, ticket_state: TicketState) -> bool:
+        return self.apply_transition(ticket, ticket_state) is not None
+
+    def apply_transition(self, ticket: Ticket, ticket_state: TicketState) -> State:
+        # returns the state the ticket left, or None when the transition is not allowed
+        with self.lock_for(ticket):
+            previous_state = ticket.get_state()
+            if not self.engine.transition(ticket, ticket_state):
+                return None
+            self.on_transition(ticket, previous_state)
+            return previous_state
+
+    def bulk_transition(self, tickets: Iterable[Ticket], ticket_state: TicketState,
+                        moved: List[Tuple[Ticket, State]] = None) -> List[Ticket]:
+        on_transition = self.on_transition
+        if moved is not None:
+            def on_transition(ticket: Ticket, previous_state: State):
+                self.on_transition(ticket, previous_state)
+                moved.append((ticket, previous_state))
+        stripes = defaultdict(list)
+        for ticket in tickets:
+            stripes[hash(ticket) % len(self.locks)].append(ticket)
+        rejected = []
+        for stripe, stripe_tickets in stripes.items():
+            with self.locks[stripe]:
+                rejected.extend(self.engine.bulk_transition(stripe_tickets, ticket_state, on_transition))
+        return rejected
@@ -0,0 +1,91 @@
+import random
+import sys
+import time
+
+from model import ParkingLot, CompactParkingSpot, Entrance
+from service import (ParkingStrategy, NearestFirstParkingStrategy, FarthestFirstParkingStrategy,
+                     NearestToEntranceParkingStrategy)
+from enums import ParkingSpotType
+
+
+class LinearNearestFirstParkingStrategy(ParkingStrategy):
+    def find_parking_spot(self, parking_lot: ParkingLot, parking_spot_type: ParkingSpotType):
+        for parking_spot in parking_lot.parking_spots[parking_spot_type]:
+            if parking_spot.available:
+                parking_spot.available = False
+                return parking_spot
+        return None
+
+
+class LinearFarthestFirstParkingStrategy(ParkingStrategy):
+    def find_parking_spot(self, parking_lot: ParkingLot, parking_spot_type: ParkingSpotType):
+        for parking_spot in parking_lot.parking_spots[parking_spot_type][::-1]:
+            if parking_spot.available:
+                parking_spot.available = False
+                return parking_spot
+        return None
+
+
+class LinearNearestToEntranceParkingStrategy(ParkingStrategy):
+    def find_parking_spot(self, parking_lot: ParkingLot, parking_spot_type: ParkingSpotType,
+                          entrance: Entrance = None):
+        free = [parking_spot for parking_spot in parking_lot.parking_spots[parking_spot_type] if parking_spot.available]
+        if not free:
+            return None
+        parking_spot = min(free, key=lambda spot: (entrance.distance_to(spot), spot.position))
+        parking_spot.available = False
+        return parking_spot
+
+
+def build_lot(spot_count: int, floors: int, entrances: int = 0) -> ParkingLot:
+    # each floor is a grid of rows 100 spots wide, 3 units apart; entrances sit along the ground floor edge
+    parking_lot = ParkingLot("Benchmark Lot")
+    per_floor = spot_count // floors
+    for position in range(spot_count):
+        on_floor = position % per_floor
+        parking_lot.add_parking_spot(CompactParkingSpot(floor_num=position // per_floor, x=on_floor % 100 * 3.0,
+                                                        y=on_floor // 100 * 3.0), ParkingSpotType.COMPACT)
+    for number in range(entrances):
+        parking_lot.add_entrance(Entrance(f"Gate {number}", 0, x=number * 300.0 / max(1, entrances - 1), y=0.0))
+    return parking_lot
+
+
+def run(strategy: ParkingStrategy, indexed: bool, spot_count: int, operations: int, fill: float,
+        entrances: int = 0) -> float:
+    parking_lot = build_lot(spot_count, floors=10, entrances=entrances)
+    gates = parking_lot.entrances or [None]
+    free_spots = parking_lot.free_spots[ParkingSpotType.COMPACT]
+    occupied = [free_spots.pop_nearest() for _ in range(int(spot_count * fill))]
+    rng = random.Random(7)
+    start = time.perf_counter()
+    for _ in range(operations):
+        # one car leaves from a random spot and the next one is allocated, keeping the lot nearly full
+        victim = rng.randrange(len(occupied))
+        occupied[victim], occupied[-1] = occupied[-1], occupied[victim]
+        parking_spot = occupied.pop()
+        if indexed:
+            parking_lot.release_parking_spot(parking_spot)
+        else:
+            parking_spot.available = True
+        entrance = gates[rng.randrange(len(gates))]
+        occupied.append(strategy.find_parking_spot(parking_lot, ParkingSpotType.COMPACT, entrance)
+                        if entrance else strategy.find_parking_spot(parking_lot, ParkingSpotType.COMPACT))
+    return operations / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    spot_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    fill = 0.95
+    print(f"{spot_count:,} spots, {fill:.0%} full, release + allocate per operation")
+    cases = [
+        ("nearest  linear", LinearNearestFirstParkingStrategy(), False, 2_000),
+        ("nearest  heap", NearestFirstParkingStrategy(), True, 200_000),
+        ("farthest linear", LinearFarthestFirstParkingStrategy(), False, 2_000),
+        ("farthest heap", FarthestFirstParkingStrategy(), True, 200_000),
+    ]
+    for name, strategy, indexed, operations in cases:
+        print(f"  {name:<16} {run(strategy, indexed, spot_count, operations, fill):12,.0f} ops/s")
+    print("nearest to a random one of 4 entrances")
+    for name, strategy, indexed, operations in (("gate linear", LinearNearestToEntranceParkingStrategy(), False, 200),
+                                                ("gate heap", NearestToEntranceParkingStrategy(), True, 100_000)):
+        print(f"  {name:<16} {run(strategy, indexed, spot_count, operations, fill, entrances=4):12,.0f} ops/s")
@@ -0,0 +1,63 @@
+import threading
+from array import array
+from datetime import datetime
+
+from model import ParkingTicket
+from pricing import PricingStrategy, SECONDS_PER_HOUR, billed_hours
+from store import SPOT_TYPE_CODES
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class ClosedTicketLog:
+    # Closed tickets as parallel columns: entry and exit as epoch seconds, the spot type as a small
+    # integer code and the spot's hourly rate at exit. The lock keeps the columns aligned.
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entry_times = array("d")
+        self.exit_times = array("d")
+        self.spot_types = array("b")
+        self.rates = array("d")
+
+    def append(self, parking_ticket: ParkingTicket, exit_time: datetime):
+        parking_spot = parking_ticket.parking_spot
+        code = SPOT_TYPE_CODES[parking_spot.parking_spot_type]
+        with self.lock:
+            self.entry_times.append(parking_ticket.timestamp.timestamp())
+            self.exit_times.append(exit_time.timestamp())
+            self.spot_types.append(code)
+            self.rates.append(parking_spot.cost)
+
+    def __len__(self):
+        return len(self.entry_times)
+
+
+class BillingService:
+    def __init__(self, pricing_strategy: PricingStrategy):
+        self.pricing_strategy = pricing_strategy
+
+    def bill(self, entry_times, exit_times, rates):
+        if np is None:
+            return self.bill_each(entry_times, exit_times, rates)
+        entry_times = np.asarray(entry_times, dtype=np.float64)
+        exit_times = np.asarray(exit_times, dtype=np.float64)
+        hours = np.maximum(1.0, np.ceil((exit_times - entry_times) / SECONDS_PER_HOUR))
+        return self.pricing_strategy.fees(np.asarray(rates, dtype=np.float64), hours)
+
+    def bill_each(self, entry_times, exit_times, rates):
+        fee = self.pricing_strategy.fee
+        return array("d", [fee(rate, billed_hours(exit_time - entry_time))
+                           for entry_time, exit_time, rate in zip(entry_times, exit_times, rates)])
+
+    def bill_closed_tickets(self, closed_tickets: ClosedTicketLog):
+        with closed_tickets.lock:
+            columns = (closed_tickets.entry_times, closed_tickets.exit_times, closed_tickets.rates)
+            if np is not None:
+                # copy while holding the lock, appends may reallocate the arrays under a zero-copy view
+                columns = tuple(np.array(column) for column in columns)
+            else:
+                columns = tuple(array(column.typecode, column) for column in columns)
+        return self.bill(*columns)
@@ -0,0 +1,50 @@
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from model import ParkingTicket, CompactParkingSpot, MiniParkingSpot, LargeParkingSpot, Car
+from enums import ParkingSpotType
+from pricing import HourlyPricing, TieredPricing
+from billing import BillingService, ClosedTicketLog, np
+
+
+def closed_tickets(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    # a premium MINI spot, so spots of one type are billed at different costs
+    premium_spot = MiniParkingSpot(0)
+    premium_spot.cost = 200
+    parking_spots = []
+    for parking_spot, parking_spot_type in ((CompactParkingSpot(0), ParkingSpotType.COMPACT),
+                                            (MiniParkingSpot(0), ParkingSpotType.MINI),
+                                            (premium_spot, ParkingSpotType.MINI),
+                                            (LargeParkingSpot(0), ParkingSpotType.LARGE)):
+        parking_spot.parking_spot_type = parking_spot_type
+        parking_spots.append(parking_spot)
+    opening = datetime(2024, 1, 1, 6)
+    tickets = []
+    for number in range(count):
+        parking_ticket = ParkingTicket(Car(str(number)), rng.choice(parking_spots), None)
+        parking_ticket.timestamp = opening + timedelta(seconds=rng.randrange(12 * 3600))
+        tickets.append((parking_ticket, parking_ticket.timestamp + timedelta(seconds=rng.randrange(60, 10 * 3600))))
+    return tickets
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    tickets = closed_tickets(count)
+    log = ClosedTicketLog()
+    for parking_ticket, exit_time in tickets:
+        log.append(parking_ticket, exit_time)
+    print(f"{count:,} closed tickets, batch path: {'numpy' if np is not None else 'pure python (numpy missing)'}")
+    for name, pricing_strategy in (("hourly", HourlyPricing()),
+                                   ("tiered", TieredPricing([(1, 1.0), (4, 0.75), (None, 0.5)]))):
+        start = time.perf_counter()
+        looped = [pricing_strategy.compute_fee(parking_ticket, exit_time) for parking_ticket, exit_time in tickets]
+        loop_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        batched = BillingService(pricing_strategy).bill_closed_tickets(log)
+        batch_seconds = time.perf_counter() - start
+        assert all(abs(a - b) < 1e-6 for a, b in zip(looped, batched))
+        print(f"  {name}: per-ticket loop {loop_seconds:6.3f}s | batch {batch_seconds:6.3f}s "
+              f"({loop_seconds / batch_seconds:5.1f}x), total billed {sum(batched):,.0f}")
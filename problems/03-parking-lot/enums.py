@@ -11,3 +11,8 @@ class ParkingSpotType(Enum):
 class PaymentMode(Enum):
     CASH = "CASH"
     CARD = "CARD"
+
+
+class OccupancyEventType(Enum):
+    ENTRY = "ENTRY"
+    EXIT = "EXIT"
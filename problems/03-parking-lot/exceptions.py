@@ -6,3 +6,13 @@ class SpotNotFoundException(Exception):
 class InvalidVehicleException(Exception):
     def __init__(self, message):
         super().__init__(message)
+
+
+class TicketNotFoundException(Exception):
+    def __init__(self, message):
+        super().__init__(message)
+
+
+class EntranceNotFoundException(Exception):
+    def __init__(self, message):
+        super().__init__(message)
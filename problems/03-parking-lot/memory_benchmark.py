@@ -0,0 +1,57 @@
+import gc
+import sys
+import time
+import tracemalloc
+
+from model import ParkingLot, CompactParkingSpot, MiniParkingSpot, LargeParkingSpot
+from store import ColumnarParkingLot
+from service import NearestFirstParkingStrategy
+from enums import ParkingSpotType
+
+SPOT_CLASSES = ((CompactParkingSpot, ParkingSpotType.COMPACT, 20), (MiniParkingSpot, ParkingSpotType.MINI, 50),
+                (LargeParkingSpot, ParkingSpotType.LARGE, 100))
+
+
+def build_objects(spot_count: int, floors: int) -> ParkingLot:
+    parking_lot = ParkingLot("Object Lot")
+    per_floor = spot_count // floors
+    for position in range(spot_count):
+        spot_class, parking_spot_type, _ = SPOT_CLASSES[position % 3]
+        parking_spot = spot_class(position // per_floor, position % 100 * 3.0, position // 100 % 100 * 3.0)
+        parking_lot.add_parking_spot(parking_spot, parking_spot_type)
+    return parking_lot
+
+
+def build_columnar(spot_count: int, floors: int) -> ColumnarParkingLot:
+    parking_lot = ColumnarParkingLot("Columnar Lot")
+    per_floor = spot_count // floors
+    for position in range(spot_count):
+        _, parking_spot_type, cost = SPOT_CLASSES[position % 3]
+        parking_lot.add_spot(position // per_floor, parking_spot_type, cost, position % 100 * 3.0,
+                             position // 100 % 100 * 3.0)
+    return parking_lot
+
+
+def measure(build, spot_count: int):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    parking_lot = build(spot_count, floors=20)
+    build_seconds = time.perf_counter() - start
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    strategy = NearestFirstParkingStrategy()
+    start = time.perf_counter()
+    claims = 0
+    while strategy.find_parking_spot(parking_lot, ParkingSpotType.MINI) is not None:
+        claims += 1
+    return allocated, build_seconds, claims / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    spot_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    print(f"{spot_count:,} spots over 3 types, 20 floors, free-spot heaps included")
+    for name, build in (("objects", build_objects), ("columnar", build_columnar)):
+        allocated, build_seconds, claims = measure(build, spot_count)
+        print(f"  {name:<9} {allocated / 2 ** 20:8.1f} MiB ({allocated / spot_count:6.1f} B/spot) | "
+              f"built in {build_seconds:5.1f}s | {claims:10,.0f} claims/s")
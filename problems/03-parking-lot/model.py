@@ -1,11 +1,16 @@
+import heapq
+import itertools
 import string
 import random
+import threading
+import time
 from typing import List, Dict
 from abc import ABC, abstractmethod
 from collections import defaultdict
 
 from datetime import datetime
 from enums import ParkingSpotType
+from occupancy import OccupancyWindow
 
 
 def generate_id():
@@ -13,9 +18,24 @@ def generate_id():
     return letters
 
 
+# next() on an itertools.count is atomic, concurrent gates never issue the same ticket id
+ticket_ids = itertools.count(1)
+
+
+# how far one floor of ramp counts for, in the same units as the x/y coordinates
+FLOOR_DISTANCE = 50.0
+
+
 class Entrance:
-    def __init__(self, name: str):
+    def __init__(self, name: str, floor_num: int = 0, x: float = 0.0, y: float = 0.0):
         self.name = name
+        self.floor_num = floor_num
+        self.x = x
+        self.y = y
+
+    def distance_to(self, parking_spot: "ParkingSpot") -> float:
+        return (abs(self.x - parking_spot.x) + abs(self.y - parking_spot.y)
+                + abs(self.floor_num - parking_spot.floor_num) * FLOOR_DISTANCE)
 
 
 class Exit:
@@ -24,34 +44,149 @@ class Exit:
 
 
 class DisplayBoard:
-    def __init__(self):
+    # counter holds the free spots per type; the rest is kept up to date on every entry and exit,
+    # so none of the queries below look at the spots themselves
+    def __init__(self, window: float = 60.0, bucket: float = 1.0, clock=time.monotonic):
         self.counter = defaultdict(int)
+        self.capacity = defaultdict(int)
+        self.floor_capacity = defaultdict(int)
+        self.floor_occupied = defaultdict(int)
+        self.floors = set()
+        self.clock = clock
+        self.windows: Dict[str, OccupancyWindow] = {
+            parking_spot_type.value: OccupancyWindow(window, bucket) for parking_spot_type in ParkingSpotType}
 
     def update(self, parking_spot_type: ParkingSpotType, change: int):
         self.counter[parking_spot_type.value] += change
 
+    def add_spot(self, parking_spot_type: ParkingSpotType, floor_num: int):
+        self.update(parking_spot_type, 1)
+        self.capacity[parking_spot_type.value] += 1
+        self.floor_capacity[floor_num, parking_spot_type.value] += 1
+        self.floors.add(floor_num)
+
+    def occupy(self, parking_spot_type: ParkingSpotType, floor_num: int):
+        self.update(parking_spot_type, -1)
+        self.floor_occupied[floor_num, parking_spot_type.value] += 1
+        self.windows[parking_spot_type.value].record(self.clock(), 1)
+
+    def vacate(self, parking_spot_type: ParkingSpotType, floor_num: int):
+        self.update(parking_spot_type, 1)
+        self.floor_occupied[floor_num, parking_spot_type.value] -= 1
+        self.windows[parking_spot_type.value].record(self.clock(), -1)
+
+    def free_on_floor(self, floor_num: int, parking_spot_type: ParkingSpotType) -> int:
+        key = floor_num, parking_spot_type.value
+        return self.floor_capacity[key] - self.floor_occupied[key]
+
+    def occupancy_by_floor(self) -> Dict[int, Dict[str, int]]:
+        return {floor_num: {parking_spot_type.value: self.floor_occupied[floor_num, parking_spot_type.value]
+                            for parking_spot_type in ParkingSpotType}
+                for floor_num in sorted(self.floors)}
+
+    def occupancy_rate(self, parking_spot_type: ParkingSpotType) -> float:
+        capacity = self.capacity[parking_spot_type.value]
+        return 1 - self.counter[parking_spot_type.value] / capacity if capacity else 0.0
+
+    def window_rates(self, parking_spot_type: ParkingSpotType):
+        # (entries/s, exits/s, mean occupancy share) over the sliding window
+        return self.windows[parking_spot_type.value].rates(self.clock(), self.capacity[parking_spot_type.value])
+
 
 class ParkingSpot(ABC):
-    def __init__(self, floor_num: int, cost: int):
+    # no slots of its own: the concrete spots below keep a __dict__, SpotView in store.py stays slotted
+    __slots__ = ()
+
+    def __init__(self, floor_num: int, cost: int, x: float = 0.0, y: float = 0.0):
         self.id: str = generate_id()
         self.floor_num: int = floor_num
         self.cost: int = cost
+        self.x: float = x
+        self.y: float = y
         self.available: bool = True
+        # assigned by the ParkingLot: insertion order within the lot and the type it was added as
+        self.position: int = None
+        self.parking_spot_type: ParkingSpotType = None
 
 
 class CompactParkingSpot(ParkingSpot):
-    def __init__(self, floor_num: int):
-        super().__init__(floor_num, 20)
+    def __init__(self, floor_num: int, x: float = 0.0, y: float = 0.0):
+        super().__init__(floor_num, 20, x, y)
 
 
 class MiniParkingSpot(ParkingSpot):
-    def __init__(self, floor_num: int):
-        super().__init__(floor_num, 50)
+    def __init__(self, floor_num: int, x: float = 0.0, y: float = 0.0):
+        super().__init__(floor_num, 50, x, y)
 
 
 class LargeParkingSpot(ParkingSpot):
-    def __init__(self, floor_num: int):
-        super().__init__(floor_num, 100)
+    def __init__(self, floor_num: int, x: float = 0.0, y: float = 0.0):
+        super().__init__(floor_num, 100, x, y)
+
+
+class FreeSpotIndex:
+    # Heaps over the free spots of one type: by (floor, position) ascending and descending, and one per
+    # entrance by distance from it. Claiming from one heap leaves stale entries in the others; they are
+    # skipped on pop, and the heaps are rebuilt once they average more than two entries per spot.
+    def __init__(self):
+        self.nearest = []
+        self.farthest = []
+        self.by_entrance: Dict[Entrance, list] = dict()
+        self.spots: List[ParkingSpot] = []
+
+    def add(self, parking_spot: ParkingSpot):
+        self.spots.append(parking_spot)
+        if parking_spot.available:
+            self.push(parking_spot)
+
+    def push(self, parking_spot: ParkingSpot):
+        heapq.heappush(self.nearest, (parking_spot.floor_num, parking_spot.position, parking_spot))
+        heapq.heappush(self.farthest, (-parking_spot.floor_num, -parking_spot.position, parking_spot))
+        for entrance, heap in self.by_entrance.items():
+            heapq.heappush(heap, (entrance.distance_to(parking_spot), parking_spot.position, parking_spot))
+        if len(self.nearest) + len(self.farthest) > 4 * len(self.spots) + 64:
+            self.rebuild()
+
+    def add_entrance(self, entrance: Entrance):
+        self.by_entrance[entrance] = self.entrance_heap(entrance)
+
+    def remove_entrance(self, entrance: Entrance):
+        self.by_entrance.pop(entrance, None)
+
+    def entrance_heap(self, entrance: Entrance) -> list:
+        heap = [(entrance.distance_to(spot), spot.position, spot) for spot in self.spots if spot.available]
+        heapq.heapify(heap)
+        return heap
+
+    def pop_nearest(self) -> ParkingSpot:
+        return self.claim(self.nearest)
+
+    def pop_farthest(self) -> ParkingSpot:
+        return self.claim(self.farthest)
+
+    def pop_nearest_to(self, entrance: Entrance) -> ParkingSpot:
+        return self.claim(self.by_entrance[entrance])
+
+    def claim(self, heap) -> ParkingSpot:
+        while heap:
+            parking_spot = heapq.heappop(heap)[2]
+            if parking_spot.available:
+                parking_spot.available = False
+                return parking_spot
+        return None
+
+    def release(self, parking_spot: ParkingSpot):
+        parking_spot.available = True
+        self.push(parking_spot)
+
+    def rebuild(self):
+        free = [parking_spot for parking_spot in self.spots if parking_spot.available]
+        self.nearest = [(spot.floor_num, spot.position, spot) for spot in free]
+        self.farthest = [(-spot.floor_num, -spot.position, spot) for spot in free]
+        heapq.heapify(self.nearest)
+        heapq.heapify(self.farthest)
+        for entrance in self.by_entrance:
+            self.by_entrance[entrance] = self.entrance_heap(entrance)
 
 
 class ParkingLot:
@@ -61,8 +196,17 @@ class ParkingLot:
         self.exits: List[Exit] = []
         self.display_board = DisplayBoard()
         self.parking_spots: Dict[ParkingSpotType, List[ParkingSpot]] = defaultdict(list)
+        self.free_spots: Dict[ParkingSpotType, FreeSpotIndex] = {
+            parking_spot_type: FreeSpotIndex() for parking_spot_type in ParkingSpotType}
+        # one lock per spot type guards its free-spot index and its DisplayBoard counter
+        self.spot_locks: Dict[ParkingSpotType, threading.Lock] = {
+            parking_spot_type: threading.Lock() for parking_spot_type in ParkingSpotType}
+        self.spot_positions = itertools.count()
 
     def add_entrance(self, entrance: Entrance):
+        for parking_spot_type, free_spots in self.free_spots.items():
+            with self.lock_for(parking_spot_type):
+                free_spots.add_entrance(entrance)
         self.entrances.append(entrance)
 
     def add_exit(self, exit: Exit):
@@ -70,13 +214,26 @@ class ParkingLot:
 
     def remove_entrance(self, entrance: Entrance):
         self.entrances.remove(entrance)
+        for parking_spot_type, free_spots in self.free_spots.items():
+            with self.lock_for(parking_spot_type):
+                free_spots.remove_entrance(entrance)
 
     def remove_exit(self, exit: Exit):
         self.exits.remove(exit)
 
+    def lock_for(self, parking_spot_type: ParkingSpotType) -> threading.Lock:
+        return self.spot_locks[parking_spot_type]
+
     def add_parking_spot(self, parking_spot: ParkingSpot, parking_spot_type: ParkingSpotType):
-        self.parking_spots[parking_spot_type].append(parking_spot)
-        self.display_board.update(parking_spot_type, 1)
+        parking_spot.position = next(self.spot_positions)
+        parking_spot.parking_spot_type = parking_spot_type
+        with self.lock_for(parking_spot_type):
+            self.parking_spots[parking_spot_type].append(parking_spot)
+            self.free_spots[parking_spot_type].add(parking_spot)
+            self.display_board.add_spot(parking_spot_type, parking_spot.floor_num)
+
+    def release_parking_spot(self, parking_spot: ParkingSpot):
+        self.free_spots[parking_spot.parking_spot_type].release(parking_spot)
 
 
 class Vehicle(ABC):
@@ -121,7 +278,7 @@ class ParkingAttendant(Account):
 class ParkingTicket:
     def __init__(self, vehicle: Vehicle, parking_spot: ParkingSpot,
                  parking_attendant: ParkingAttendant):
-        self.id: str = generate_id()
+        self.id: int = next(ticket_ids)
         self.vehicle: Vehicle = vehicle
         self.parking_spot = parking_spot
         self.timestamp = datetime.now()
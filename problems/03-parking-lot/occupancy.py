@@ -0,0 +1,132 @@
+import queue
+import threading
+from collections import deque
+from typing import Iterator, List
+
+from enums import ParkingSpotType, OccupancyEventType
+
+
+class OccupancyWindow:
+    # Entries, exits and occupancy of one spot type over the last `window` seconds, in buckets of
+    # `bucket` seconds. Each bucket samples the occupancy at its end; running sums are kept as buckets
+    # open and fall out of the window, so reading the rates never walks the buckets.
+    def __init__(self, window: float = 60.0, bucket: float = 1.0):
+        self.lock = threading.Lock()
+        self.bucket = bucket
+        self.size = max(1, int(window / bucket))
+        self.buckets = deque()
+        self.occupied = 0
+        self.entries = 0
+        self.exits = 0
+        self.occupied_total = 0
+
+    def advance(self, now: float) -> list:
+        index = int(now // self.bucket)
+        if self.buckets and self.buckets[-1][0] >= index:
+            return self.buckets[-1]
+        start = self.buckets[-1][0] + 1 if self.buckets else index
+        for bucket_index in range(max(start, index - self.size + 1), index + 1):
+            self.buckets.append([bucket_index, 0, 0, self.occupied])
+            self.occupied_total += self.occupied
+        while self.buckets[0][0] <= index - self.size:
+            _, entries, exits, occupied = self.buckets.popleft()
+            self.entries -= entries
+            self.exits -= exits
+            self.occupied_total -= occupied
+        return self.buckets[-1]
+
+    def record(self, now: float, change: int):
+        with self.lock:
+            bucket = self.advance(now)
+            self.occupied += change
+            bucket[3] += change
+            self.occupied_total += change
+            if change > 0:
+                bucket[1] += 1
+                self.entries += 1
+            else:
+                bucket[2] += 1
+                self.exits += 1
+
+    def rates(self, now: float, capacity: int):
+        # entries per second, exits per second and mean occupancy share over the window
+        with self.lock:
+            self.advance(now)
+            seconds = len(self.buckets) * self.bucket
+            mean_occupied = self.occupied_total / len(self.buckets)
+            return self.entries / seconds, self.exits / seconds, mean_occupied / capacity if capacity else 0.0
+
+
+class OccupancyEvent:
+    __slots__ = ("event_type", "lot_name", "ticket_id", "vehicle_id", "parking_spot_type", "floor_num",
+                 "position", "timestamp")
+
+    def __init__(self, event_type: OccupancyEventType, lot_name: str, ticket_id: int, vehicle_id: str,
+                 parking_spot_type: ParkingSpotType, floor_num: int, position: int, timestamp: float):
+        self.event_type = event_type
+        self.lot_name = lot_name
+        self.ticket_id = ticket_id
+        self.vehicle_id = vehicle_id
+        self.parking_spot_type = parking_spot_type
+        self.floor_num = floor_num
+        self.position = position
+        # time.time() when the gate let the vehicle through
+        self.timestamp = timestamp
+
+
+class Subscription:
+    def __init__(self, stream: "OccupancyStream", capacity: int):
+        self.stream = stream
+        self.queue = queue.Queue(capacity)
+        # events dropped because this subscriber fell behind; gates never wait on a slow dashboard
+        self.dropped = 0
+
+    def offer(self, event: OccupancyEvent):
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+
+    def get(self, timeout: float = None) -> OccupancyEvent:
+        return self.queue.get(timeout=timeout)
+
+    def drain(self) -> List[OccupancyEvent]:
+        events = []
+        while True:
+            try:
+                events.append(self.queue.get_nowait())
+            except queue.Empty:
+                return events
+
+    def events(self) -> Iterator[OccupancyEvent]:
+        while True:
+            event = self.queue.get()
+            if event is None:
+                return
+            yield event
+
+    def close(self):
+        self.stream.unsubscribe(self)
+        # ends events() once the consumer has read everything before it; waits for room if the queue is full
+        self.queue.put(None)
+
+
+class OccupancyStream:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscriptions: List[Subscription] = []
+
+    def subscribe(self, capacity: int = 1024) -> Subscription:
+        subscription = Subscription(self, capacity)
+        with self.lock:
+            self.subscriptions = self.subscriptions + [subscription]
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self.lock:
+            self.subscriptions = [other for other in self.subscriptions if other is not subscription]
+
+    def publish(self, event: OccupancyEvent):
+        # the subscriber list is replaced, never mutated, so publishing reads it without the lock
+        for subscription in self.subscriptions:
+            subscription.offer(event)
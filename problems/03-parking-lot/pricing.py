@@ -0,0 +1,73 @@
+import math
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import List, Tuple
+
+from model import ParkingTicket
+
+SECONDS_PER_HOUR = 3600
+
+
+def billed_hours(seconds: float) -> int:
+    # every started hour is charged, and every stay at least one hour
+    return max(1, math.ceil(seconds / SECONDS_PER_HOUR))
+
+
+class PricingStrategy(ABC):
+    # fee() prices one stay from the spot's hourly rate; fees() does the same over whole NumPy
+    # columns of rates and billed hours for the batch billing job.
+    @abstractmethod
+    def fee(self, rate: float, hours: int) -> float:
+        pass
+
+    @abstractmethod
+    def fees(self, rates, hours):
+        pass
+
+    def compute_fee(self, parking_ticket: ParkingTicket, exit_time: datetime) -> float:
+        hours = billed_hours((exit_time - parking_ticket.timestamp).total_seconds())
+        return self.fee(parking_ticket.parking_spot.cost, hours)
+
+
+class FlatPricing(PricingStrategy):
+    def fee(self, rate: float, hours: int) -> float:
+        return rate
+
+    def fees(self, rates, hours):
+        return rates * 1.0
+
+
+class HourlyPricing(PricingStrategy):
+    def fee(self, rate: float, hours: int) -> float:
+        return rate * hours
+
+    def fees(self, rates, hours):
+        return rates * hours
+
+
+class TieredPricing(PricingStrategy):
+    # tiers are (last hour of the band, fraction of the hourly rate), the final band open ended,
+    # e.g. [(1, 1.0), (4, 0.75), (None, 0.5)]: full price for the first hour, 75% up to hour 4, then half
+    def __init__(self, tiers: List[Tuple[int, float]]):
+        self.bands = []
+        start = 0
+        for end, multiplier in tiers:
+            self.bands.append((start, end, multiplier))
+            start = end
+        if self.bands[-1][1] is not None:
+            raise Exception("The last pricing tier must be open ended")
+
+    def fee(self, rate: float, hours: int) -> float:
+        total = 0.0
+        for start, end, multiplier in self.bands:
+            if hours <= start:
+                break
+            total += ((hours if end is None else min(hours, end)) - start) * multiplier
+        return rate * total
+
+    def fees(self, rates, hours):
+        total = 0.0
+        for start, end, multiplier in self.bands:
+            band_hours = hours - start if end is None else hours.clip(start, end) - start
+            total = total + band_hours.clip(0, None) * multiplier
+        return rates * total
@@ -0,0 +1,48 @@
+import threading
+from typing import Dict
+
+from model import ParkingTicket, ParkingSpot
+from exceptions import InvalidVehicleException, TicketNotFoundException
+
+
+class TicketRegistry:
+    # Active tickets by id and by vehicle id. Opening and closing a ticket touch both maps, so they
+    # happen under one lock; lookups are single dict reads and take no lock.
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.tickets: Dict[int, ParkingTicket] = dict()
+        self.by_vehicle: Dict[str, ParkingTicket] = dict()
+
+    def open(self, parking_ticket: ParkingTicket):
+        with self.lock:
+            if parking_ticket.vehicle.id in self.by_vehicle:
+                raise InvalidVehicleException(f"Vehicle {parking_ticket.vehicle.id} is already parked")
+            self.tickets[parking_ticket.id] = parking_ticket
+            self.by_vehicle[parking_ticket.vehicle.id] = parking_ticket
+
+    def close(self, ticket_id: int, vehicle_id: str) -> ParkingTicket:
+        with self.lock:
+            parking_ticket = self.tickets.get(ticket_id)
+            if parking_ticket is None:
+                raise TicketNotFoundException(f"No active parking ticket {ticket_id}")
+            if parking_ticket.vehicle.id != vehicle_id:
+                raise InvalidVehicleException("Invalid vehicle for the parking ticket")
+            del self.tickets[ticket_id]
+            del self.by_vehicle[vehicle_id]
+        return parking_ticket
+
+    def get(self, ticket_id: int) -> ParkingTicket:
+        parking_ticket = self.tickets.get(ticket_id)
+        if parking_ticket is None:
+            raise TicketNotFoundException(f"No active parking ticket {ticket_id}")
+        return parking_ticket
+
+    def find_by_vehicle(self, vehicle_id: str) -> ParkingTicket:
+        return self.by_vehicle.get(vehicle_id)
+
+    def locate(self, vehicle_id: str) -> ParkingSpot:
+        parking_ticket = self.by_vehicle.get(vehicle_id)
+        return parking_ticket.parking_spot if parking_ticket is not None else None
+
+    def __len__(self):
+        return len(self.tickets)
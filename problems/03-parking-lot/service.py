@@ -1,41 +1,53 @@
 from model import ParkingLot, Admin, Entrance, Exit, Vehicle, ParkingAttendant, ParkingTicket, Cash, Card, ParkingSpot
+import time
 from abc import ABC, abstractmethod
-from enums import ParkingSpotType
-from exceptions import InvalidVehicleException, SpotNotFoundException
+from typing import Dict, List
+from datetime import datetime
+from enums import ParkingSpotType, OccupancyEventType
+from exceptions import (InvalidVehicleException, SpotNotFoundException, TicketNotFoundException,
+                        EntranceNotFoundException)
+from repository import TicketRegistry
+from pricing import PricingStrategy, FlatPricing
+from billing import ClosedTicketLog
+from occupancy import OccupancyStream, OccupancyEvent
 
 
 class ParkingStrategy(ABC):
     @abstractmethod
-    def find_parking_spot(self, parking_lot: ParkingLot, parking_spot_type: ParkingSpotType):
+    def find_parking_spot(self, parking_lot: ParkingLot, parking_spot_type: ParkingSpotType,
+                          entrance: Entrance = None):
         pass
 
 
 class NearestFirstParkingStrategy(ParkingStrategy):
-    def find_parking_spot(self, parking_lot: ParkingLot, parking_spot_type: ParkingSpotType):
-        parking_spots = parking_lot.parking_spots[parking_spot_type]
-        for parking_spot in parking_spots:
-            if parking_spot.available:
-                parking_spot.available = False
-                return parking_spot
-        return None
+    def find_parking_spot(self, parking_lot: ParkingLot, parking_spot_type: ParkingSpotType,
+                          entrance: Entrance = None):
+        return parking_lot.free_spots[parking_spot_type].pop_nearest()
 
 
 class FarthestFirstParkingStrategy(ParkingStrategy):
-    def find_parking_spot(self, parking_lot: ParkingLot, parking_spot_type: ParkingSpotType):
-        parking_spots = parking_lot.parking_spots[parking_spot_type]
-        for parking_spot in parking_spots[::-1]:
-            if parking_spot.available:
-                parking_spot.available = False
-                return parking_spot
-        return None
+    def find_parking_spot(self, parking_lot: ParkingLot, parking_spot_type: ParkingSpotType,
+                          entrance: Entrance = None):
+        return parking_lot.free_spots[parking_spot_type].pop_farthest()
+
+
+class NearestToEntranceParkingStrategy(ParkingStrategy):
+    def find_parking_spot(self, parking_lot: ParkingLot, parking_spot_type: ParkingSpotType,
+                          entrance: Entrance = None):
+        free_spots = parking_lot.free_spots[parking_spot_type]
+        if entrance is None:
+            return free_spots.pop_nearest()
+        if entrance not in free_spots.by_entrance:
+            raise EntranceNotFoundException(f"Entrance {entrance.name} is not an entrance of {parking_lot.name}")
+        return free_spots.pop_nearest_to(entrance)
 
 
 class AdminService:
     def __init__(self, admin: Admin):
         self.admin = admin
 
-    def add_entrance(self, name: str):
-        self.admin.parking_lot.add_entrance(Entrance(name))
+    def add_entrance(self, name: str, floor_num: int = 0, x: float = 0.0, y: float = 0.0):
+        self.admin.parking_lot.add_entrance(Entrance(name, floor_num, x, y))
 
     def add_exit(self, name: str):
         self.admin.parking_lot.add_exit(Exit(name))
@@ -70,25 +82,105 @@ class PaymentService:
 
 class ParkingService:
     def __init__(self, parking_lot: ParkingLot, parking_strategy: ParkingStrategy,
-                 parking_attendant_service: ParkingAttendantService, payment_service: PaymentService):
+                 parking_attendant_service: ParkingAttendantService, payment_service: PaymentService,
+                 pricing_strategy: PricingStrategy = None):
         self.parking_lot = parking_lot
         self.parking_strategy = parking_strategy
         self.parking_attendant_service = parking_attendant_service
         self.payment_service = payment_service
+        self.pricing_strategy = pricing_strategy or FlatPricing()
+        self.ticket_registry = TicketRegistry()
+        self.closed_tickets = ClosedTicketLog()
+        self.occupancy_stream = OccupancyStream()
+
+    def entry(self, vehicle: Vehicle, entrance: Entrance = None):
+        if self.ticket_registry.find_by_vehicle(vehicle.id) is not None:
+            raise InvalidVehicleException(f"Vehicle {vehicle.id} is already parked")
+        # gates for other spot types never wait on this lock, and it is held only for the heap pop
+        with self.parking_lot.lock_for(vehicle.parking_spot_type):
+            parking_spot = self.parking_strategy.find_parking_spot(self.parking_lot, vehicle.parking_spot_type,
+                                                                   entrance)
+            if parking_spot:
+                self.parking_lot.display_board.occupy(vehicle.parking_spot_type, parking_spot.floor_num)
+        if not parking_spot:
+            raise SpotNotFoundException("No valid parking spot for your vehicle found")
+        parking_ticket = self.parking_attendant_service.create_parking_ticket(vehicle, parking_spot)
+        try:
+            self.ticket_registry.open(parking_ticket)
+        except InvalidVehicleException:
+            # the same vehicle got in through another gate in the meantime
+            self.release(parking_spot)
+            raise
+        self.publish(OccupancyEventType.ENTRY, parking_ticket)
+        return parking_ticket
 
-    def entry(self, vehicle: Vehicle):
-        parking_spot = self.parking_strategy.find_parking_spot(self.parking_lot, vehicle.parking_spot_type)
-        if parking_spot:
-            parking_ticket = self.parking_attendant_service.create_parking_ticket(vehicle, parking_spot)
-            self.parking_lot.display_board.update(vehicle.parking_spot_type, -1)
+    def exit(self, parking_ticket: ParkingTicket, vehicle: Vehicle):
+        # the registry's copy is authoritative, a forged or already used ticket is rejected here
+        parking_ticket = self.ticket_registry.close(parking_ticket.id, vehicle.id)
+        exit_time = datetime.now()
+        self.release(parking_ticket.parking_spot)
+        self.publish(OccupancyEventType.EXIT, parking_ticket)
+        self.closed_tickets.append(parking_ticket, exit_time)
+        amount = self.pricing_strategy.compute_fee(parking_ticket, exit_time)
+        return amount
+
+    def release(self, parking_spot: ParkingSpot):
+        with self.parking_lot.lock_for(parking_spot.parking_spot_type):
+            self.parking_lot.release_parking_spot(parking_spot)
+            self.parking_lot.display_board.vacate(parking_spot.parking_spot_type, parking_spot.floor_num)
+
+    def publish(self, event_type: OccupancyEventType, parking_ticket: ParkingTicket):
+        if not self.occupancy_stream.subscriptions:
+            return
+        parking_spot = parking_ticket.parking_spot
+        self.occupancy_stream.publish(OccupancyEvent(event_type, self.parking_lot.name, parking_ticket.id,
+                                                     parking_ticket.vehicle.id, parking_spot.parking_spot_type,
+                                                     parking_spot.floor_num, parking_spot.position, time.time()))
+
+    def find_vehicle(self, vehicle_id: str) -> ParkingSpot:
+        return self.ticket_registry.locate(vehicle_id)
+
+    def free_share(self, parking_spot_type: ParkingSpotType) -> float:
+        total = len(self.parking_lot.parking_spots[parking_spot_type])
+        if total == 0:
+            return 0.0
+        return self.parking_lot.display_board.counter[parking_spot_type.value] / total
+
+
+class ParkingCoordinator:
+    # Spreads vehicles over several lots: each entry goes to the lot with the largest free share
+    # of the vehicle's spot type, read off the DisplayBoard counters, falling back to the others when
+    # that lot fills up in the meantime. Ticket ids are unique across lots, so exits route by id.
+    def __init__(self, parking_services: List[ParkingService]):
+        self.parking_services = parking_services
+        self.by_ticket: Dict[int, ParkingService] = dict()
+
+    def entry(self, vehicle: Vehicle) -> ParkingTicket:
+        if self.find_vehicle(vehicle.id) is not None:
+            raise InvalidVehicleException(f"Vehicle {vehicle.id} is already parked")
+        ranked = sorted(self.parking_services,
+                        key=lambda parking_service: parking_service.free_share(vehicle.parking_spot_type),
+                        reverse=True)
+        for parking_service in ranked:
+            try:
+                parking_ticket = parking_service.entry(vehicle)
+            except SpotNotFoundException:
+                continue
+            self.by_ticket[parking_ticket.id] = parking_service
             return parking_ticket
-        else:
-            raise SpotNotFoundException("No valid parking spot for your vehicle found")
+        raise SpotNotFoundException("No valid parking spot for your vehicle found in any lot")
 
     def exit(self, parking_ticket: ParkingTicket, vehicle: Vehicle):
-        if parking_ticket.vehicle != vehicle:
-            raise InvalidVehicleException("Invalid vehicle for the parking ticket")
-        parking_ticket.parking_spot.available = True
-        self.parking_lot.display_board.update(vehicle.parking_spot_type, 1)
-        amount = parking_ticket.parking_spot.cost
+        parking_service = self.by_ticket.get(parking_ticket.id)
+        if parking_service is None:
+            raise TicketNotFoundException(f"No active parking ticket {parking_ticket.id}")
+        amount = parking_service.exit(parking_ticket, vehicle)
+        del self.by_ticket[parking_ticket.id]
         return amount
+
+    def find_vehicle(self, vehicle_id: str) -> ParkingSpot:
+        for parking_service in self.parking_services:
+            parking_spot = parking_service.find_vehicle(vehicle_id)
+            if parking_spot is not None:
+                return parking_spot
+        return None
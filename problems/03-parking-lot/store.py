@@ -0,0 +1,214 @@
+import heapq
+import threading
+from array import array
+from typing import Dict, List
+
+from model import ParkingLot, ParkingSpot, Entrance, FLOOR_DISTANCE
+from enums import ParkingSpotType
+
+SPOT_TYPES: List[ParkingSpotType] = list(ParkingSpotType)
+SPOT_TYPE_CODES: Dict[ParkingSpotType, int] = {parking_spot_type: code
+                                               for code, parking_spot_type in enumerate(SPOT_TYPES)}
+POSITION_BITS = 32
+POSITION_MASK = (1 << POSITION_BITS) - 1
+# floors are signed 16-bit so basements work; biased to be non-negative before they go into a heap key
+FLOOR_BIAS = 1 << 15
+# entrance heaps key on the distance in hundredths of a coordinate unit
+DISTANCE_SCALE = 100
+
+
+class SpotStore:
+    # One row per spot across typed columns, about 20 bytes a spot; the row number is the spot's position.
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.floor_nums = array("h")
+        self.spot_types = array("B")
+        self.costs = array("i")
+        self.xs = array("f")
+        self.ys = array("f")
+        self.available = bytearray()
+
+    def add(self, floor_num: int, parking_spot_type: ParkingSpotType, cost: int, x: float, y: float) -> int:
+        if not -FLOOR_BIAS <= floor_num < FLOOR_BIAS:
+            raise Exception(f"Floor {floor_num} is outside the {-FLOOR_BIAS}..{FLOOR_BIAS - 1} a SpotStore can hold")
+        with self.lock:
+            self.floor_nums.append(floor_num)
+            self.spot_types.append(SPOT_TYPE_CODES[parking_spot_type])
+            self.costs.append(cost)
+            self.xs.append(x)
+            self.ys.append(y)
+            self.available.append(1)
+            return len(self.available) - 1
+
+    def view(self, position: int) -> "SpotView":
+        return SpotView(self, position)
+
+    def __len__(self):
+        return len(self.available)
+
+
+class SpotView(ParkingSpot):
+    # A ParkingSpot that reads and writes its row in a SpotStore. Views are created on demand and
+    # compare equal when they point at the same row, so they can key dicts like the spots themselves.
+    __slots__ = ("store", "position")
+
+    def __init__(self, store: SpotStore, position: int):
+        self.store = store
+        self.position = position
+
+    @property
+    def id(self) -> str:
+        return str(self.position)
+
+    @property
+    def floor_num(self) -> int:
+        return self.store.floor_nums[self.position]
+
+    @property
+    def cost(self) -> int:
+        return self.store.costs[self.position]
+
+    @property
+    def x(self) -> float:
+        return self.store.xs[self.position]
+
+    @property
+    def y(self) -> float:
+        return self.store.ys[self.position]
+
+    @property
+    def parking_spot_type(self) -> ParkingSpotType:
+        return SPOT_TYPES[self.store.spot_types[self.position]]
+
+    @property
+    def available(self) -> bool:
+        return self.store.available[self.position] == 1
+
+    @available.setter
+    def available(self, available: bool):
+        self.store.available[self.position] = 1 if available else 0
+
+    def __eq__(self, other):
+        return isinstance(other, SpotView) and other.store is self.store and other.position == self.position
+
+    def __hash__(self):
+        return hash(self.position)
+
+
+class StoredSpots:
+    # The spots of one type as a read-only sequence of views, standing in for ParkingLot.parking_spots lists.
+    def __init__(self, store: SpotStore, positions: array):
+        self.store = store
+        self.positions = positions
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [SpotView(self.store, position) for position in self.positions[index]]
+        return SpotView(self.store, self.positions[index])
+
+    def __iter__(self):
+        store = self.store
+        return (SpotView(store, position) for position in self.positions)
+
+
+class ColumnarFreeSpotIndex:
+    # FreeSpotIndex over a SpotStore: the heaps hold plain ints packing the sort key above the
+    # position, so a free spot costs one int per heap instead of a tuple and a spot object.
+    def __init__(self, store: SpotStore):
+        self.store = store
+        self.nearest: List[int] = []
+        self.farthest: List[int] = []
+        self.by_entrance: Dict[Entrance, List[int]] = dict()
+        self.positions = array("I")
+
+    def add(self, position: int):
+        self.positions.append(position)
+        if self.store.available[position]:
+            self.push(position)
+
+    def push(self, position: int):
+        key = (self.store.floor_nums[position] + FLOOR_BIAS) << POSITION_BITS | position
+        heapq.heappush(self.nearest, key)
+        heapq.heappush(self.farthest, -key)
+        for entrance, heap in self.by_entrance.items():
+            heapq.heappush(heap, self.entrance_key(entrance, position))
+        if len(self.nearest) + len(self.farthest) > 4 * len(self.positions) + 64:
+            self.rebuild()
+
+    def entrance_key(self, entrance: Entrance, position: int) -> int:
+        store = self.store
+        distance = (abs(entrance.x - store.xs[position]) + abs(entrance.y - store.ys[position])
+                    + abs(entrance.floor_num - store.floor_nums[position]) * FLOOR_DISTANCE)
+        return int(distance * DISTANCE_SCALE) << POSITION_BITS | position
+
+    def add_entrance(self, entrance: Entrance):
+        self.by_entrance[entrance] = self.entrance_heap(entrance)
+
+    def remove_entrance(self, entrance: Entrance):
+        self.by_entrance.pop(entrance, None)
+
+    def entrance_heap(self, entrance: Entrance) -> List[int]:
+        available = self.store.available
+        heap = [self.entrance_key(entrance, position) for position in self.positions if available[position]]
+        heapq.heapify(heap)
+        return heap
+
+    def pop_nearest(self) -> SpotView:
+        return self.claim(self.nearest)
+
+    def pop_farthest(self) -> SpotView:
+        return self.claim(self.farthest)
+
+    def pop_nearest_to(self, entrance: Entrance) -> SpotView:
+        return self.claim(self.by_entrance[entrance])
+
+    def claim(self, heap: List[int]) -> SpotView:
+        available = self.store.available
+        while heap:
+            position = abs(heapq.heappop(heap)) & POSITION_MASK
+            if available[position]:
+                available[position] = 0
+                return SpotView(self.store, position)
+        return None
+
+    def release(self, parking_spot: SpotView):
+        self.store.available[parking_spot.position] = 1
+        self.push(parking_spot.position)
+
+    def rebuild(self):
+        floor_nums = self.store.floor_nums
+        available = self.store.available
+        self.nearest = [(floor_nums[position] + FLOOR_BIAS) << POSITION_BITS | position
+                        for position in self.positions if available[position]]
+        self.farthest = [-key for key in self.nearest]
+        heapq.heapify(self.nearest)
+        heapq.heapify(self.farthest)
+        for entrance in self.by_entrance:
+            self.by_entrance[entrance] = self.entrance_heap(entrance)
+
+
+class ColumnarParkingLot(ParkingLot):
+    # A ParkingLot whose spots live in a SpotStore. Strategies, the DisplayBoard and ParkingService
+    # use it unchanged; add_spot() adds a spot without ever building a ParkingSpot object.
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.store = SpotStore()
+        self.free_spots: Dict[ParkingSpotType, ColumnarFreeSpotIndex] = {
+            parking_spot_type: ColumnarFreeSpotIndex(self.store) for parking_spot_type in ParkingSpotType}
+        self.parking_spots: Dict[ParkingSpotType, StoredSpots] = {
+            parking_spot_type: StoredSpots(self.store, free_spots.positions)
+            for parking_spot_type, free_spots in self.free_spots.items()}
+
+    def add_spot(self, floor_num: int, parking_spot_type: ParkingSpotType, cost: int,
+                 x: float = 0.0, y: float = 0.0) -> int:
+        position = self.store.add(floor_num, parking_spot_type, cost, x, y)
+        with self.lock_for(parking_spot_type):
+            self.free_spots[parking_spot_type].add(position)
+            self.display_board.add_spot(parking_spot_type, floor_num)
+        return position
+
+    def add_parking_spot(self, parking_spot: ParkingSpot, parking_spot_type: ParkingSpotType):
+        self.add_spot(parking_spot.floor_num, parking_spot_type, parking_spot.cost, parking_spot.x, parking_spot.y)
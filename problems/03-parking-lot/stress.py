@@ -0,0 +1,121 @@
+import queue
+import random
+import sys
+import threading
+import time
+
+from model import ParkingLot, CompactParkingSpot, MiniParkingSpot, LargeParkingSpot, MotorBike, Car, Truck
+from service import (NearestFirstParkingStrategy, ParkingAttendantService, PaymentService, ParkingService)
+from store import ColumnarParkingLot
+from enums import ParkingSpotType, OccupancyEventType
+from exceptions import SpotNotFoundException
+
+
+def build_service(spots_per_type: int, parking_lot_class: type) -> ParkingService:
+    parking_lot = parking_lot_class("Stress Lot")
+    for floor_num in range(spots_per_type):
+        parking_lot.add_parking_spot(CompactParkingSpot(floor_num // 10), ParkingSpotType.COMPACT)
+        parking_lot.add_parking_spot(MiniParkingSpot(floor_num // 10), ParkingSpotType.MINI)
+        parking_lot.add_parking_spot(LargeParkingSpot(floor_num // 10), ParkingSpotType.LARGE)
+    return ParkingService(parking_lot, NearestFirstParkingStrategy(), ParkingAttendantService(), PaymentService())
+
+
+def entrance(parking_service: ParkingService, holders: dict, tickets: queue.Queue, entries: int, seed: int,
+             errors: list, rejected: list):
+    rng = random.Random(seed)
+    vehicle_types = (MotorBike, Car, Truck)
+    for number in range(entries):
+        vehicle = rng.choice(vehicle_types)(f"{seed}-{number}")
+        try:
+            parking_ticket = parking_service.entry(vehicle)
+        except SpotNotFoundException:
+            rejected.append(vehicle)
+            continue
+        # setdefault is atomic: a second ticket for a spot that is still held means it was handed out twice
+        if holders.setdefault(parking_ticket.parking_spot, parking_ticket) is not parking_ticket:
+            errors.append(f"spot {parking_ticket.parking_spot.position} allocated twice")
+        tickets.put(parking_ticket)
+
+
+def exit_gate(parking_service: ParkingService, holders: dict, tickets: queue.Queue):
+    while True:
+        parking_ticket = tickets.get()
+        if parking_ticket is None:
+            return
+        del holders[parking_ticket.parking_spot]
+        parking_service.exit(parking_ticket, parking_ticket.vehicle)
+
+
+def check_display_board(parking_lot: ParkingLot, errors: list):
+    display_board = parking_lot.display_board
+    for parking_spot_type, parking_spots in parking_lot.parking_spots.items():
+        available = sum(parking_spot.available for parking_spot in parking_spots)
+        shown = display_board.counter[parking_spot_type.value]
+        if shown != available:
+            errors.append(f"{parking_spot_type.value}: display board shows {shown}, {available} spots are free")
+        for floor_num in display_board.floors:
+            available = sum(parking_spot.available for parking_spot in parking_spots
+                            if parking_spot.floor_num == floor_num)
+            shown = display_board.free_on_floor(floor_num, parking_spot_type)
+            if shown != available:
+                errors.append(f"{parking_spot_type.value} on floor {floor_num}: display board shows {shown}, "
+                              f"{available} spots are free")
+
+
+def count_events(subscription, counts: dict):
+    for event in subscription.events():
+        counts[event.event_type] += 1
+
+
+def run(entrance_count: int, exit_count: int, entries_per_entrance: int, spots_per_type: int,
+        parking_lot_class: type = ParkingLot):
+    parking_service = build_service(spots_per_type, parking_lot_class)
+    holders = dict()
+    tickets = queue.Queue()
+    errors = []
+    rejected = []
+    subscription = parking_service.occupancy_stream.subscribe(capacity=10_000)
+    counts = {OccupancyEventType.ENTRY: 0, OccupancyEventType.EXIT: 0}
+    dashboard = threading.Thread(target=count_events, args=(subscription, counts))
+    dashboard.start()
+    entrances = [threading.Thread(target=entrance, args=(parking_service, holders, tickets, entries_per_entrance,
+                                                         seed, errors, rejected))
+                 for seed in range(entrance_count)]
+    exits = [threading.Thread(target=exit_gate, args=(parking_service, holders, tickets))
+             for _ in range(exit_count)]
+    start = time.perf_counter()
+    for thread in entrances + exits:
+        thread.start()
+    for thread in entrances:
+        thread.join()
+    for _ in exits:
+        tickets.put(None)
+    for thread in exits:
+        thread.join()
+    seconds = time.perf_counter() - start
+    subscription.close()
+    dashboard.join()
+    check_display_board(parking_service.parking_lot, errors)
+    parked = entrance_count * entries_per_entrance - len(rejected)
+    if counts[OccupancyEventType.ENTRY] + counts[OccupancyEventType.EXIT] + subscription.dropped != 2 * parked:
+        errors.append(f"occupancy stream delivered {counts} and dropped {subscription.dropped} "
+                      f"for {parked:,} stays")
+    return parked, len(rejected), seconds, errors
+
+
+if __name__ == "__main__":
+    entrance_count = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    exit_count = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    # switch threads as often as possible so that unsynchronized claims would actually interleave
+    sys.setswitchinterval(1e-6)
+    failed = False
+    for parking_lot_class in (ParkingLot, ColumnarParkingLot):
+        parked, rejected, seconds, errors = run(entrance_count, exit_count, entries_per_entrance=20_000,
+                                                spots_per_type=500, parking_lot_class=parking_lot_class)
+        print(f"{parking_lot_class.__name__}, {entrance_count} entrances, {exit_count} exits: {parked:,} parked, "
+              f"{rejected:,} turned away in {seconds:.1f}s")
+        for error in errors[:10]:
+            print(f"  {error}")
+        print("  display board consistent, no spot allocated twice" if not errors else f"  {len(errors)} errors")
+        failed = failed or bool(errors)
+    sys.exit(1 if failed else 0)
@@ -1,31 +1,81 @@
+import bisect
+import re
+from collections import defaultdict
 from datetime import datetime, date
-from typing import List
+from typing import Dict, Iterable, List, Set
 from enum import Enum
 
 
 class BMSService:
+    # Shows are indexed as city -> cinema hall -> auditorium -> day, plus a per-city
+    # day -> movie -> shows map for the common "movie M in city C on day D" query.
+    # Both are filled in as shows are added, queries never walk the halls.
     def __init__(self):
         self.cinema_halls: List[CinemaHall] = []
+        self.halls_by_city: Dict[str, Dict[str, CinemaHall]] = defaultdict(dict)
+        self.shows_by_city: Dict[str, Dict[date, Dict[str, List[Show]]]] = defaultdict(
+            lambda: defaultdict(lambda: defaultdict(list)))
+        self.search = Search()
+
+    def add_cinema_hall(self, cinema_hall: "CinemaHall"):
+        self.cinema_halls.append(cinema_hall)
+        self.halls_by_city[cinema_hall.address.city.lower()][cinema_hall.id] = cinema_hall
+
+    def add_show(self, show: "Show", auditorium: "Auditorium"):
+        # checked before anything is indexed, so a rejected show leaves no partial entries behind
+        if auditorium.cinema_hall is None:
+            raise Exception(f"Auditorium {auditorium.id} is not attached to a cinema hall, "
+                            f"add it with CinemaHall.add_auditorium")
+        if not isinstance(auditorium.cinema_hall.address, Address):
+            raise Exception(f"Cinema hall {auditorium.cinema_hall.id} has no Address to take the city from")
+        if show.movie is None:
+            raise Exception(f"Show {show.id} has no movie")
+        cinema_hall = auditorium.cinema_hall
+        city = cinema_hall.address.city.lower()
+        # a hall only attached through CinemaHall.add_auditorium is registered here, like Search does for movies
+        if cinema_hall.id not in self.halls_by_city.get(city, {}):
+            self.add_cinema_hall(cinema_hall)
+        # registers the movie with Search if needed, get_movies resolves ids through it
+        self.search.add_show(show)
+        auditorium.add_show(show)
+        add_by_start_time(self.shows_by_city[city][as_date(show.start_time)][show.movie.id], show)
 
     def get_movies(self, date: datetime, city: str):
-        return []
+        movie_ids = self.shows_by_city.get(city.lower(), {}).get(as_date(date), {})
+        return [self.search.movies[movie_id] for movie_id in movie_ids]
 
     def get_cinema_halls(self, city: str):
-        return self.cinema_halls
+        return list(self.halls_by_city.get(city.lower(), {}).values())
+
+    def get_shows(self, movie: "Movie", city: str, date: datetime) -> List["Show"]:
+        return list(self.shows_by_city.get(city.lower(), {}).get(as_date(date), {}).get(movie.id, []))
 
 
 class CinemaHall:
-    def __init__(self, id: str, name: str, address: str):
+    def __init__(self, id: str, name: str, address: "Address"):
         self.id: str = id
         self.name: str = name
-        self.address: str = address
+        self.address: Address = address
         self.auditoriums: List[Auditorium] = []
 
+    def add_auditorium(self, auditorium: "Auditorium"):
+        auditorium.cinema_hall = self
+        self.auditoriums.append(auditorium)
+
     def get_movies(self, dates: List[datetime]) -> dict:
-        return {}
+        movies = {}
+        for day, shows in self.get_shows(dates).items():
+            movies[day] = list({show.movie.id: show.movie for show in shows}.values())
+        return movies
 
     def get_shows(self, dates: List[datetime]) -> dict:
-        return {}
+        shows = {}
+        for day in map(as_date, dates):
+            day_shows = []
+            for auditorium in self.auditoriums:
+                day_shows.extend(auditorium.shows_by_date.get(day, []))
+            shows[day] = sorted(day_shows, key=start_time)
+        return shows
 
 
 class Address:
@@ -41,7 +91,15 @@ class Auditorium:
     def __init__(self, id: str, name: str):
         self.id: str = id
         self.name: str = name
+        self.cinema_hall: CinemaHall = None
         self.shows: List[Show] = []
+        # the same shows bucketed by the day they start on, each bucket ordered by start time
+        self.shows_by_date: Dict[date, List[Show]] = defaultdict(list)
+
+    def add_show(self, show: "Show"):
+        show.auditorium = self
+        self.shows.append(show)
+        add_by_start_time(self.shows_by_date[as_date(show.start_time)], show)
 
 
 class Show:
@@ -50,9 +108,18 @@ class Show:
         self.movie = movie
         self.start_time = start_time
         self.end_time = end_time
+        self.auditorium: Auditorium = None
         self.seats: List[Seat] = []
 
 
+def start_time(show: Show) -> datetime:
+    return show.start_time
+
+
+def add_by_start_time(shows: List[Show], show: Show):
+    bisect.insort(shows, show, key=start_time)
+
+
 class SeatType(Enum):
     DELUXE = 'DELUXE'
     VIP = 'VIP'
@@ -164,22 +231,162 @@ class Member(SystemMember):
 
 
 class Admin(SystemMember):
+    def __init__(self, id: str, account, name: str, email: str, address: Address, bms_service: BMSService):
+        super().__init__(id, account, name, email, address)
+        self.bms_service = bms_service
+
     def add_movie(self, movie: Movie):
-        pass
+        self.bms_service.search.add_movie(movie)
 
-    def add_show(self, show: Show):
-        pass
+    def add_show(self, show: Show, auditorium: Auditorium):
+        self.bms_service.add_show(show, auditorium)
 
 
-class Search:
-    def search_movies_by_name(self, name: str):
-        pass
+def tokenize(text: str) -> List[str]:
+    return re.findall(r"\w+", text.lower())
 
-    def search_movies_by_genre(self, genre: Genre):
-        pass
 
-    def search_movies_by_language(self, language: str):
-        pass
+def as_date(value) -> date:
+    return value.date() if isinstance(value, datetime) else value
 
-    def search_movies_by_date(self, date: datetime):
-        pass
+
+class TrieNode:
+    __slots__ = ("children", "postings")
+
+    def __init__(self):
+        self.children: Dict[str, TrieNode] = {}
+        # ids of the movies with a name token ending at this node
+        self.postings: Set[str] = set()
+
+
+class NameIndex:
+    # Prefix trie over the lower-cased words of movie names; a query word matches every name word it
+    # is a prefix of, so "dark kni" finds "The Dark Knight".
+    def __init__(self):
+        self.root = TrieNode()
+
+    def add(self, movie_id: str, name: str):
+        for token in tokenize(name):
+            node = self.root
+            for char in token:
+                child = node.children.get(char)
+                if child is None:
+                    child = node.children[char] = TrieNode()
+                node = child
+            node.postings.add(movie_id)
+
+    def find_prefix(self, prefix: str) -> Set[str]:
+        node = self.root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return set()
+        found = set()
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            found |= node.postings
+            stack.extend(node.children.values())
+        return found
+
+    def find(self, name: str) -> Set[str]:
+        return intersect([self.find_prefix(token) for token in tokenize(name)])
+
+
+class DateIndex:
+    # Posting sets per day plus the days in sorted order, for single-day and range lookups.
+    def __init__(self):
+        self.postings: Dict[date, Set[str]] = defaultdict(set)
+        self.days: List[date] = []
+
+    def add(self, movie_id: str, day: date):
+        if day not in self.postings:
+            bisect.insort(self.days, day)
+        self.postings[day].add(movie_id)
+
+    def find(self, day: date) -> Set[str]:
+        return self.postings.get(day, set())
+
+    def find_range(self, start: date, end: date) -> Set[str]:
+        found = set()
+        for day in self.days[bisect.bisect_left(self.days, start):bisect.bisect_right(self.days, end)]:
+            found |= self.postings[day]
+        return found
+
+
+def intersect(postings: Iterable[Set[str]]) -> Set[str]:
+    # smallest first, so each step walks at most the shrinking candidate set
+    postings = sorted(postings, key=len)
+    if not postings:
+        return set()
+    result = set(postings[0])
+    for posting in postings[1:]:
+        if not result:
+            break
+        result &= posting
+    return result
+
+
+class Search:
+    def __init__(self):
+        self.movies: Dict[str, Movie] = {}
+        self.names = NameIndex()
+        self.genres: Dict[Genre, Set[str]] = defaultdict(set)
+        self.languages: Dict[str, Set[str]] = defaultdict(set)
+        self.release_dates = DateIndex()
+        self.show_dates = DateIndex()
+
+    def add_movie(self, movie: Movie):
+        self.movies[movie.id] = movie
+        self.names.add(movie.id, movie.name)
+        self.genres[movie.genre].add(movie.id)
+        self.languages[movie.language.lower()].add(movie.id)
+        self.release_dates.add(movie.id, movie.release_date)
+
+    def add_show(self, show: Show):
+        # a show can arrive before its movie was added; every id in an index must resolve in self.movies
+        if show.movie.id not in self.movies:
+            self.add_movie(show.movie)
+        self.show_dates.add(show.movie.id, as_date(show.start_time))
+
+    def search_movies_by_name(self, name: str) -> List[Movie]:
+        return self.to_movies(self.names.find(name))
+
+    def search_movies_by_genre(self, genre: Genre) -> List[Movie]:
+        return self.to_movies(self.genres.get(genre, set()))
+
+    def search_movies_by_language(self, language: str) -> List[Movie]:
+        return self.to_movies(self.languages.get(language.lower(), set()))
+
+    def search_movies_by_date(self, date: datetime) -> List[Movie]:
+        # movies with a show on that day
+        return self.to_movies(self.show_dates.find(as_date(date)))
+
+    def search_movies_by_release_date(self, start: date, end: date = None) -> List[Movie]:
+        return self.to_movies(self.release_dates.find_range(start, end or start))
+
+    def search(self, name: str = None, genre: Genre = None, language: str = None, show_date: datetime = None,
+               released_from: date = None, released_to: date = None) -> List[Movie]:
+        postings = []
+        if name is not None:
+            postings.append(self.names.find(name))
+        if genre is not None:
+            postings.append(self.genres.get(genre, set()))
+        if language is not None:
+            postings.append(self.languages.get(language.lower(), set()))
+        if show_date is not None:
+            postings.append(self.show_dates.find(as_date(show_date)))
+        released = released_from is not None or released_to is not None
+        released_from, released_to = released_from or date.min, released_to or date.max
+        if not postings:
+            if released:
+                return self.to_movies(self.release_dates.find_range(released_from, released_to))
+            return list(self.movies.values())
+        movies = self.to_movies(intersect(postings))
+        if released:
+            # a wide range unions many days, checking the few remaining candidates is cheaper
+            movies = [movie for movie in movies if released_from <= movie.release_date <= released_to]
+        return movies
+
+    def to_movies(self, movie_ids: Iterable[str]) -> List[Movie]:
+        return [self.movies[movie_id] for movie_id in movie_ids]
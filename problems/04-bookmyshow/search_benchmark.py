@@ -0,0 +1,90 @@
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+from main import Search, Movie, Show, Genre, tokenize, as_date
+
+SYLLABLES = ["ka", "ro", "mi", "tan", "sha", "dor", "vel", "lu", "zen", "qua", "bri", "mon", "ex", "ti", "sol"]
+LANGUAGES = ["English", "Hindi", "Tamil", "Telugu", "Bengali", "Marathi", "Kannada", "Malayalam", "Spanish",
+             "French", "German", "Japanese", "Korean", "Mandarin", "Italian", "Punjabi", "Gujarati", "Urdu",
+             "Russian", "Portuguese"]
+
+
+def catalog(movie_count: int, show_count: int, seed: int = 7):
+    rng = random.Random(seed)
+    words = sorted({"".join(rng.choices(SYLLABLES, k=rng.randint(2, 4))) for _ in range(20_000)})
+    genres = list(Genre)
+    first_release = date(1990, 1, 1)
+    movies = [Movie(str(number), " ".join(rng.choices(words, k=rng.randint(1, 4))), rng.randint(80, 180),
+                    rng.choice(LANGUAGES), first_release + timedelta(days=rng.randrange(35 * 365)),
+                    rng.choice(genres))
+              for number in range(movie_count)]
+    first_show = datetime(2024, 1, 1, 9)
+    shows = []
+    for number in range(show_count):
+        start_time = first_show + timedelta(days=rng.randrange(90), hours=rng.randrange(14))
+        shows.append(Show(str(number), rng.choice(movies), start_time, start_time + timedelta(hours=3)))
+    return movies, shows
+
+
+def linear_search(movies, shows, name: str = None, genre: Genre = None, language: str = None,
+                  show_date: date = None, released_from: date = None, released_to: date = None):
+    query_tokens = tokenize(name) if name is not None else []
+    showing = None
+    if show_date is not None:
+        showing = {show.movie.id for show in shows if as_date(show.start_time) == show_date}
+    found = []
+    for movie in movies:
+        if genre is not None and movie.genre != genre:
+            continue
+        if language is not None and movie.language.lower() != language.lower():
+            continue
+        if released_from is not None and movie.release_date < released_from:
+            continue
+        if released_to is not None and movie.release_date > released_to:
+            continue
+        if showing is not None and movie.id not in showing:
+            continue
+        if query_tokens:
+            tokens = tokenize(movie.name)
+            if not all(any(token.startswith(query_token) for token in tokens) for query_token in query_tokens):
+                continue
+        found.append(movie)
+    return found
+
+
+def timed(function, repeat: int):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return result, (time.perf_counter() - start) / repeat
+
+
+if __name__ == "__main__":
+    movie_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    show_count = movie_count
+    movies, shows = catalog(movie_count, show_count)
+    search = Search()
+    start = time.perf_counter()
+    for movie in movies:
+        search.add_movie(movie)
+    for show in shows:
+        search.add_show(show)
+    print(f"{movie_count:,} movies, {show_count:,} shows, indexed in {time.perf_counter() - start:.1f}s")
+    sample = movies[12345 % movie_count]
+    name_words = tokenize(sample.name)
+    queries = {
+        "name prefix": dict(name=name_words[0][:5]),
+        "two-word name": dict(name=" ".join(word[:4] for word in name_words[:2])),
+        "genre + language": dict(genre=Genre.HORROR, language="tamil"),
+        "language + show day": dict(language="Hindi", show_date=date(2024, 2, 14)),
+        "name + genre + released": dict(name=name_words[0][:3], genre=sample.genre,
+                                        released_from=date(2000, 1, 1), released_to=date(2009, 12, 31)),
+    }
+    for query_name, query in queries.items():
+        indexed, indexed_seconds = timed(lambda: search.search(**query), 20)
+        scanned, scan_seconds = timed(lambda: linear_search(movies, shows, **query), 1)
+        assert {movie.id for movie in indexed} == {movie.id for movie in scanned}
+        print(f"  {query_name:<24} {len(indexed):>8,} hits | index {indexed_seconds * 1000:9.2f} ms | "
+              f"scan {scan_seconds * 1000:9.1f} ms | {scan_seconds / indexed_seconds:8.0f}x")
@@ -0,0 +1,115 @@
+import sys
+import time
+import tracemalloc
+
+from model import Cache
+from enums import EvictionPolicyType
+
+
+class LegacyListNode:
+    def __init__(self, value):
+        self.val = value
+        self.prev = None
+        self.next = None
+
+
+class LegacyLinkedList:
+    def __init__(self):
+        self.head = None
+        self.tail = None
+
+    def attach(self, node):
+        if self.head is None:
+            self.head = node
+            self.tail = node
+        else:
+            self.tail.next = node
+            node.prev = self.tail
+            self.tail = node
+
+    def detach(self, node):
+        if self.head == node:
+            if self.head == self.tail:
+                self.head = None
+                self.tail = None
+            else:
+                self.head = self.head.next
+                self.head.prev = None
+        elif self.tail == node:
+            self.tail.prev.next = None
+            self.tail = self.tail.prev
+        else:
+            node.prev.next = node.next
+            node.next.prev = node.prev
+        node.prev = None
+        node.next = None
+
+
+class LegacyCache:
+    # The two-dict layout this package used before the unified node index, kept for comparison.
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.storage = dict()
+        self.mapper = dict()
+        self.list = LegacyLinkedList()
+
+    def access_key(self, key):
+        if key in self.mapper:
+            node = self.mapper[key]
+            self.list.detach(node)
+        else:
+            node = LegacyListNode(key)
+            self.mapper[key] = node
+        self.list.attach(node)
+
+    def get(self, key):
+        if key not in self.storage:
+            raise Exception("Key doesn't exist")
+        value = self.storage[key]
+        self.access_key(key)
+        return value
+
+    def put(self, key, value):
+        if len(self.storage.keys()) == self.capacity:
+            node = self.list.head
+            self.list.detach(node)
+            self.mapper.pop(node.val)
+            self.storage.pop(node.val)
+        self.storage[key] = value
+        self.access_key(key)
+
+
+def run(name, factory, key_count):
+    keys = [str(i) for i in range(key_count)]
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    cache = factory(key_count)
+    for key in keys:
+        cache.put(key, key)
+    put_seconds = time.perf_counter() - start
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for key in keys:
+        cache.get(key)
+    get_seconds = time.perf_counter() - start
+
+    # A second pass over fresh keys makes every put evict.
+    start = time.perf_counter()
+    for key in keys:
+        cache.put(key + "'", key)
+    evict_seconds = time.perf_counter() - start
+
+    print(f"{name:<10} memory {memory / 2 ** 20:8.1f} MiB | "
+          f"put {key_count / put_seconds:12,.0f} ops/s | "
+          f"get {key_count / get_seconds:12,.0f} ops/s | "
+          f"put+evict {key_count / evict_seconds:12,.0f} ops/s")
+
+
+if __name__ == "__main__":
+    key_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    print(f"LRU cache, {key_count:,} keys")
+    run("legacy", LegacyCache, key_count)
+    run("unified", lambda capacity: Cache(capacity, EvictionPolicyType.LRU), key_count)
@@ -4,3 +4,6 @@ from enum import Enum
 class EvictionPolicyType(Enum):
     LRU = "LRU"
     FIFO = "FIFO"
+    LFU = "LFU"
+    ARC = "ARC"
+    W_TINY_LFU = "W-TinyLFU"
@@ -1,101 +1,416 @@
+import threading
+import time
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Dict, List
 
-from util import DoublyLinkedList, ListNode
+from util import DoublyLinkedList, ListNode, CountMinSketch, TimingWheel
 from enums import EvictionPolicyType
+from exceptions import KeyNotFoundException
 
 
 class EvictionPolicy(ABC):
-    def __init__(self):
+    def __init__(self, capacity: int):
+        self.capacity = capacity
         self.list = DoublyLinkedList()
-        self.mapper = dict()
+
+    def before_insert(self, key):
+        pass
 
     @abstractmethod
-    def access_key(self, key):
+    def add_node(self, node: ListNode):
         pass
 
     @abstractmethod
-    def evict_key(self):
+    def access_node(self, node: ListNode):
         pass
 
+    @abstractmethod
+    def evict_node(self) -> ListNode:
+        pass
+
+    def remove_node(self, node: ListNode):
+        self.list.detach(node)
+
+    def reinsert_node(self, node: ListNode):
+        # puts back a node taken out with remove_node, counting the rewrite as an access
+        self.add_node(node)
+        self.access_node(node)
+
 
 class LeastRecentlyUsed(EvictionPolicy):
 
-    def access_key(self, key):
-        if key in self.mapper:
-            node = self.mapper[key]
-            self.list.detach(node)
-        else:
-            node = ListNode(key)
-            self.mapper[key] = node
+    def add_node(self, node: ListNode):
         self.list.attach(node)
 
-    def evict_key(self):
-        node = self.list.head
-        self.list.detach(node)
-        self.mapper.pop(node.val)
-        return node.val
+    def access_node(self, node: ListNode):
+        self.list.move_to_end(node)
+
+    def evict_node(self) -> ListNode:
+        return self.list.detach_first()
 
 
 class FirstInFirstOut(EvictionPolicy):
 
-    def access_key(self, key):
-        if key not in self.mapper:
-            node = ListNode(key)
-            self.mapper[key] = node
-            self.list.attach(node)
+    def add_node(self, node: ListNode):
+        self.list.attach(node)
 
-    def evict_key(self):
-        node = self.list.head
-        self.list.detach(node)
-        self.mapper.pop(node.val)
-        return node.val
+    def access_node(self, node: ListNode):
+        pass
+
+    def evict_node(self) -> ListNode:
+        return self.list.detach_first()
+
+
+class LeastFrequentlyUsed(EvictionPolicy):
+    def __init__(self, capacity: int):
+        super().__init__(capacity)
+        self.buckets: Dict[int, DoublyLinkedList] = dict()
+        self.min_frequency = 0
+
+    def add_node(self, node: ListNode):
+        node.tag = 1
+        self.bucket(1).attach(node)
+        self.min_frequency = 1
+
+    def access_node(self, node: ListNode):
+        frequency = node.tag
+        self.unlink(node)
+        if frequency == self.min_frequency and frequency not in self.buckets:
+            self.min_frequency = frequency + 1
+        node.tag = frequency + 1
+        self.bucket(frequency + 1).attach(node)
+
+    def evict_node(self) -> ListNode:
+        if self.min_frequency not in self.buckets:
+            self.min_frequency = min(self.buckets)
+        # ties on frequency are broken by recency: each bucket is kept in LRU order
+        node = self.buckets[self.min_frequency].first()
+        self.unlink(node)
+        return node
+
+    def remove_node(self, node: ListNode):
+        self.unlink(node)
+
+    def reinsert_node(self, node: ListNode):
+        # the node keeps its frequency rather than starting over at 1
+        frequency = node.tag + 1
+        node.tag = frequency
+        self.bucket(frequency).attach(node)
+        if frequency < self.min_frequency or len(self.buckets) == 1:
+            self.min_frequency = frequency
+
+    def bucket(self, frequency: int) -> DoublyLinkedList:
+        bucket = self.buckets.get(frequency)
+        if bucket is None:
+            bucket = self.buckets[frequency] = DoublyLinkedList()
+        return bucket
+
+    def unlink(self, node: ListNode):
+        bucket = self.buckets[node.tag]
+        bucket.detach(node)
+        if bucket.is_empty():
+            del self.buckets[node.tag]
+
+
+class AdaptiveReplacementCache(EvictionPolicy):
+    def __init__(self, capacity: int):
+        super().__init__(capacity)
+        self.recent = DoublyLinkedList()
+        self.frequent = DoublyLinkedList()
+        self.recent_ghosts = OrderedDict()
+        self.frequent_ghosts = OrderedDict()
+        self.target = 0
+        self.ghost_hit = None
+
+    def before_insert(self, key):
+        if key in self.recent_ghosts:
+            delta = max(len(self.frequent_ghosts) / len(self.recent_ghosts), 1)
+            self.target = min(self.target + delta, self.capacity)
+            self.ghost_hit = self.recent_ghosts
+            del self.recent_ghosts[key]
+        elif key in self.frequent_ghosts:
+            delta = max(len(self.recent_ghosts) / len(self.frequent_ghosts), 1)
+            self.target = max(self.target - delta, 0)
+            self.ghost_hit = self.frequent_ghosts
+            del self.frequent_ghosts[key]
+        else:
+            self.ghost_hit = None
+
+    def add_node(self, node: ListNode):
+        node.tag = self.recent if self.ghost_hit is None else self.frequent
+        node.tag.attach(node)
+        self.ghost_hit = None
+
+    def access_node(self, node: ListNode):
+        if node.tag is self.frequent:
+            self.frequent.move_to_end(node)
+        else:
+            self.recent.detach(node)
+            node.tag = self.frequent
+            self.frequent.attach(node)
+
+    def evict_node(self) -> ListNode:
+        recent_size = len(self.recent)
+        if recent_size and (self.frequent.is_empty() or recent_size > self.target or
+                            (self.ghost_hit is self.frequent_ghosts and recent_size == self.target)):
+            node = self.recent.detach_first()
+            self.recent_ghosts[node.key] = None
+        else:
+            node = self.frequent.detach_first()
+            self.frequent_ghosts[node.key] = None
+        self.trim_ghosts()
+        return node
+
+    def remove_node(self, node: ListNode):
+        node.tag.detach(node)
+
+    def trim_ghosts(self):
+        while self.recent_ghosts and len(self.recent) + len(self.recent_ghosts) > self.capacity:
+            self.recent_ghosts.popitem(last=False)
+        while self.frequent_ghosts and len(self.frequent_ghosts) + len(self.recent_ghosts) > self.capacity:
+            self.frequent_ghosts.popitem(last=False)
+
+
+class WindowTinyLeastFrequentlyUsed(EvictionPolicy):
+    WINDOW_RATIO = 0.01
+    PROTECTED_RATIO = 0.8
+
+    def __init__(self, capacity: int):
+        super().__init__(capacity)
+        self.window_capacity = max(1, int(capacity * self.WINDOW_RATIO))
+        self.main_capacity = capacity - self.window_capacity
+        self.protected_capacity = int(self.main_capacity * self.PROTECTED_RATIO)
+        self.window = DoublyLinkedList()
+        self.probation = DoublyLinkedList()
+        self.protected = DoublyLinkedList()
+        self.sketch = CountMinSketch(capacity)
+
+    def before_insert(self, key):
+        self.sketch.increment(key)
+
+    def add_node(self, node: ListNode):
+        node.tag = self.window
+        self.window.attach(node)
+        if len(self.window) > self.window_capacity and \
+                len(self.probation) + len(self.protected) < self.main_capacity:
+            self.move(self.window.first(), self.probation)
+
+    def access_node(self, node: ListNode):
+        self.sketch.increment(node.key)
+        if node.tag is self.probation:
+            self.move(node, self.protected)
+            if len(self.protected) > self.protected_capacity:
+                self.move(self.protected.first(), self.probation)
+        else:
+            node.tag.move_to_end(node)
+
+    def evict_node(self) -> ListNode:
+        candidate = self.window.first()
+        victim = self.probation.first() or self.protected.first()
+        if candidate is None:
+            self.remove_node(victim)
+            return victim
+        if victim is None:
+            self.remove_node(candidate)
+            return candidate
+        # the window's LRU entry is only admitted to the main space if it is more popular than the main victim
+        if self.sketch.frequency(candidate.key) > self.sketch.frequency(victim.key):
+            self.remove_node(victim)
+            self.move(candidate, self.probation)
+            return victim
+        self.remove_node(candidate)
+        return candidate
+
+    def remove_node(self, node: ListNode):
+        node.tag.detach(node)
+
+    def move(self, node: ListNode, segment: DoublyLinkedList):
+        node.tag.detach(node)
+        node.tag = segment
+        segment.attach(node)
 
 
 class Storage:
-    def __init__(self, capacity):
-        self.storage = dict()
+    def __init__(self, capacity, weigher: Callable = None):
+        self.storage: Dict[str, ListNode] = dict()
         self.capacity = capacity
+        self.weigher = weigher
+        self.weight = 0
+        self.peak_weight = 0
 
-    def get(self, key) -> str:
-        if key not in self.storage:
-            raise Exception("Key doesn't exist")
-        return self.storage[key]
+    def get(self, key) -> ListNode:
+        node = self.storage.get(key)
+        if node is None:
+            raise KeyNotFoundException("Key doesn't exist")
+        return node
+
+    def find(self, key) -> ListNode:
+        return self.storage.get(key)
+
+    def add(self, node: ListNode):
+        self.storage[node.key] = node
+        self.weight += node.weight
+
+    def remove(self, key) -> ListNode:
+        node = self.storage.pop(key)
+        self.weight -= node.weight
+        return node
+
+    def weigh(self, key, value) -> int:
+        return 1 if self.weigher is None else self.weigher(key, value)
 
-    def add(self, key, value) -> bool:
-        self.storage[key] = value
+    def reweigh(self, node: ListNode, weight: int):
+        self.weight += weight - node.weight
+        node.weight = weight
 
-    def remove(self, key) -> bool:
-        self.storage.pop(key)
+    def record_peak_weight(self):
+        if self.weight > self.peak_weight:
+            self.peak_weight = self.weight
 
-    def is_storage_full(self) -> bool:
-        if len(self.storage.keys()) == self.capacity:
-            return True
-        return False
+    def is_storage_full(self, incoming_weight: int = 1) -> bool:
+        # without a weigher every entry weighs 1, so this is the plain entry count check
+        return self.weight + incoming_weight > self.capacity
+
+
+class CacheStats:
+    def __init__(self, evictions: int = 0, expirations: int = 0, weight: int = 0, peak_weight: int = 0):
+        self.evictions = evictions
+        self.expirations = expirations
+        self.weight = weight
+        # for an aggregate of several caches this is the sum of their peaks, an upper bound on the joint peak
+        self.peak_weight = peak_weight
+
+    def __add__(self, other: 'CacheStats') -> 'CacheStats':
+        return CacheStats(self.evictions + other.evictions, self.expirations + other.expirations,
+                          self.weight + other.weight, self.peak_weight + other.peak_weight)
 
 
 class Cache:
-    def __init__(self, capacity, eviction_policy: str):
+    def __init__(self, capacity, eviction_policy: EvictionPolicyType, expiry_tick: float = 1.0,
+                 clock=time.monotonic, weigher: Callable = None):
+        if weigher is not None and eviction_policy in (EvictionPolicyType.ARC, EvictionPolicyType.W_TINY_LFU):
+            # both size their segments and ghost/sketch tables in entries, not in weight
+            raise Exception("Weighted capacity is not supported by this eviction policy")
         self.capacity = capacity
-        self.storage = Storage(capacity)
-        self.eviction_policy = EvictionPolicyFactory.get_eviction_policy(eviction_policy)
+        self.storage = Storage(capacity, weigher)
+        self.eviction_policy = EvictionPolicyFactory.get_eviction_policy(eviction_policy, capacity)
+        self.clock = clock
+        self.timing_wheel = TimingWheel(expiry_tick, clock())
+        self.stats = CacheStats()
 
     def get(self, key) -> str:
-        value = self.storage.get(key)
-        self.eviction_policy.access_key(key)
-        return value
+        now = self.expire()
+        node = self.storage.get(key)
+        # the wheel fires at tick granularity, so a key can still be present shortly after its deadline
+        if node.expires_at is not None and node.expires_at <= now:
+            self.remove_node(node)
+            self.stats.expirations += 1
+            raise KeyNotFoundException("Key doesn't exist")
+        self.eviction_policy.access_node(node)
+        return node.val
+
+    def put(self, key, value, ttl: float = None):
+        now = self.expire(self.clock() if ttl is not None else None)
+        expires_at = now + ttl if ttl is not None else None
+        weight = self.storage.weigh(key, value)
+        if weight > self.capacity:
+            raise Exception("Entry is larger than the cache capacity")
+        node = self.storage.find(key)
+        if node is not None:
+            node.val = value
+            node.expires_at = expires_at
+            if weight > node.weight:
+                # out of the policy while room is made, so the entry being written is never the one evicted
+                self.eviction_policy.remove_node(node)
+                self.storage.reweigh(node, weight)
+                self.make_room(0)
+                self.eviction_policy.reinsert_node(node)
+            else:
+                self.storage.reweigh(node, weight)
+                self.eviction_policy.access_node(node)
+        else:
+            self.eviction_policy.before_insert(key)
+            self.make_room(weight)
+            node = ListNode(key, value)
+            node.expires_at = expires_at
+            node.weight = weight
+            self.storage.add(node)
+            self.eviction_policy.add_node(node)
+        self.storage.record_peak_weight()
+        if expires_at is not None:
+            self.timing_wheel.schedule(expires_at, node)
+
+    def make_room(self, incoming_weight: int):
+        while self.storage.is_storage_full(incoming_weight):
+            self.storage.remove(self.eviction_policy.evict_node().key)
+            self.stats.evictions += 1
+
+    def get_stats(self) -> CacheStats:
+        return CacheStats(self.stats.evictions, self.stats.expirations,
+                          self.storage.weight, self.storage.peak_weight)
+
+    def expire(self, now: float = None) -> float:
+        if now is None:
+            if not self.timing_wheel.size:
+                return None
+            now = self.clock()
+        # wheel entries are never unscheduled: an entry whose node was evicted, removed or
+        # given a new deadline since it was scheduled is stale and simply dropped here
+        for expires_at, node in self.timing_wheel.advance(now):
+            if node.expires_at == expires_at and self.storage.find(node.key) is node:
+                self.remove_node(node)
+                self.stats.expirations += 1
+        return now
+
+    def remove_node(self, node: ListNode):
+        self.storage.remove(node.key)
+        self.eviction_policy.remove_node(node)
+
+
+class ShardedCache:
+    def __init__(self, capacity, eviction_policy: EvictionPolicyType, shard_count: int = 16):
+        if capacity < shard_count:
+            raise Exception("Capacity must be at least the number of shards")
+        base, remainder = divmod(capacity, shard_count)
+        self.capacity = capacity
+        self.shards: List[Cache] = [Cache(base + (1 if index < remainder else 0), eviction_policy)
+                                    for index in range(shard_count)]
+        self.locks: List[threading.Lock] = [threading.Lock() for _ in range(shard_count)]
+
+    def shard_index(self, key) -> int:
+        return hash(key) % len(self.shards)
+
+    def get(self, key) -> str:
+        index = self.shard_index(key)
+        with self.locks[index]:
+            return self.shards[index].get(key)
+
+    def put(self, key, value, ttl: float = None):
+        index = self.shard_index(key)
+        with self.locks[index]:
+            self.shards[index].put(key, value, ttl)
 
-    def put(self, key, value) -> bool:
-        if self.storage.is_storage_full():
-            self.storage.remove(self.eviction_policy.evict_key())
-        self.storage.add(key, value)
-        self.eviction_policy.access_key(key)
+    def get_stats(self) -> CacheStats:
+        stats = CacheStats()
+        for index, shard in enumerate(self.shards):
+            with self.locks[index]:
+                stats = stats + shard.get_stats()
+        return stats
 
 
 class EvictionPolicyFactory:
 
     @classmethod
-    def get_eviction_policy(cls, eviction_policy_type: str):
+    def get_eviction_policy(cls, eviction_policy_type: EvictionPolicyType, capacity: int) -> EvictionPolicy:
         if eviction_policy_type == EvictionPolicyType.LRU:
-            return LeastRecentlyUsed()
+            return LeastRecentlyUsed(capacity)
         elif eviction_policy_type == EvictionPolicyType.FIFO:
-            return FirstInFirstOut()
+            return FirstInFirstOut(capacity)
+        elif eviction_policy_type == EvictionPolicyType.LFU:
+            return LeastFrequentlyUsed(capacity)
+        elif eviction_policy_type == EvictionPolicyType.ARC:
+            return AdaptiveReplacementCache(capacity)
+        elif eviction_policy_type == EvictionPolicyType.W_TINY_LFU:
+            return WindowTinyLeastFrequentlyUsed(capacity)
+        raise Exception("Invalid eviction policy")
@@ -0,0 +1,202 @@
+import threading
+from typing import Callable, Dict, Iterable, Tuple
+
+from model import Cache
+from exceptions import KeyNotFoundException
+
+
+MISSING = object()
+
+
+class PendingLoad:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+    def complete(self, value):
+        self.value = value
+        self.done.set()
+
+    def fail(self, error: Exception):
+        self.error = error
+        self.done.set()
+
+    def wait(self):
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+class LoadingCache:
+    def __init__(self, cache: Cache, loader: Callable, writer: Callable[[Dict], None] = None,
+                 batch_size: int = 100, flush_interval: float = 1.0):
+        self.cache = cache
+        self.loader = loader
+        self.writer = writer
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.lock = threading.Lock()
+        self.loads: Dict[str, PendingLoad] = dict()
+        # key -> (value, expires_at), so a value brought back from here keeps its deadline
+        self.pending_writes: Dict[str, Tuple[str, float]] = dict()
+        # the batch the writer is persisting right now, the backing store may not have it yet
+        self.writing: Dict[str, Tuple[str, float]] = dict()
+        # taken inside self.lock when both are needed, never the other way around
+        self.write_condition = threading.Condition()
+        # serializes writer calls so an older batch can never land after a newer one
+        self.flush_lock = threading.Lock()
+        self.closed = False
+        self.flusher = None
+        if writer is not None:
+            self.flusher = threading.Thread(target=self.flush_loop, daemon=True)
+            self.flusher.start()
+
+    def get(self, key) -> str:
+        with self.lock:
+            try:
+                return self.cache.get(key)
+            except KeyNotFoundException:
+                pass
+            value = self.unwritten(key)
+            if value is not MISSING:
+                return value
+            load = self.loads.get(key)
+            if load is not None:
+                owner = False
+            else:
+                owner = True
+                load = self.loads[key] = PendingLoad()
+        if not owner:
+            return load.wait()
+        self.load(key, load)
+        return load.wait()
+
+    def get_many(self, keys: Iterable) -> Dict:
+        values = dict()
+        owned = dict()
+        waiting = dict()
+        with self.lock:
+            for key in keys:
+                try:
+                    values[key] = self.cache.get(key)
+                    continue
+                except KeyNotFoundException:
+                    pass
+                value = self.unwritten(key)
+                if value is not MISSING:
+                    values[key] = value
+                    continue
+                load = self.loads.get(key)
+                if load is not None:
+                    waiting[key] = load
+                elif key not in owned:
+                    owned[key] = self.loads[key] = PendingLoad()
+        for key, load in owned.items():
+            self.load(key, load)
+        for key, load in {**owned, **waiting}.items():
+            values[key] = load.wait()
+        return values
+
+    def put(self, key, value, ttl: float = None):
+        self.put_many({key: value}, ttl)
+
+    def put_many(self, items: Dict, ttl: float = None):
+        with self.lock:
+            for key, value in items.items():
+                self.cache.put(key, value, ttl)
+                # a load still in flight for this key now holds an older value, it must not overwrite this one
+                self.loads.pop(key, None)
+            if self.writer is not None:
+                expires_at = self.cache.clock() + ttl if ttl is not None else None
+                # queued in the same critical section, so writes reach the writer in the order they hit the cache
+                with self.write_condition:
+                    for key, value in items.items():
+                        self.pending_writes[key] = (value, expires_at)
+                    if len(self.pending_writes) >= self.batch_size:
+                        self.write_condition.notify()
+
+    def unwritten(self, key):
+        # a value evicted before write-behind persisted it; the loader would return the stale stored one
+        if self.writer is None:
+            return MISSING
+        with self.write_condition:
+            entry = self.pending_writes.get(key, MISSING)
+            if entry is MISSING:
+                entry = self.writing.get(key, MISSING)
+        if entry is MISSING:
+            return MISSING
+        value, expires_at = entry
+        if expires_at is None:
+            self.cache.put(key, value)
+            return value
+        ttl = expires_at - self.cache.clock()
+        if ttl <= 0:
+            return MISSING
+        self.cache.put(key, value, ttl)
+        return value
+
+    def load(self, key, load: PendingLoad):
+        try:
+            value = self.loader(key)
+        except Exception as error:
+            with self.lock:
+                if self.loads.get(key) is load:
+                    del self.loads[key]
+            load.fail(error)
+            return
+        with self.lock:
+            if self.loads.get(key) is load:
+                self.cache.put(key, value)
+                del self.loads[key]
+        load.complete(value)
+
+    def flush(self):
+        with self.flush_lock:
+            with self.write_condition:
+                batch, self.pending_writes = self.pending_writes, dict()
+                self.writing = batch
+            if not batch:
+                return
+            try:
+                self.writer({key: value for key, (value, _) in batch.items()})
+            except Exception:
+                with self.write_condition:
+                    # keep anything written since the failed batch was taken
+                    self.pending_writes = {**batch, **self.pending_writes}
+                    self.writing = dict()
+                raise
+            with self.write_condition:
+                self.writing = dict()
+
+    def flush_loop(self):
+        while True:
+            with self.write_condition:
+                while not self.pending_writes and not self.closed:
+                    self.write_condition.wait()
+                if not self.closed and len(self.pending_writes) < self.batch_size:
+                    # linger so that a trickle of writes still goes out as one batch
+                    self.write_condition.wait(self.flush_interval)
+                closed = self.closed
+            try:
+                self.flush()
+            except Exception:
+                if not closed:
+                    self.sleep_after_failure()
+            if closed:
+                return
+
+    def sleep_after_failure(self):
+        with self.write_condition:
+            self.write_condition.wait(self.flush_interval)
+
+    def close(self):
+        if self.flusher is None:
+            return
+        with self.write_condition:
+            self.closed = True
+            self.write_condition.notify()
+        self.flusher.join()
+        self.flusher = None
+        self.flush()
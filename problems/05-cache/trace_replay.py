@@ -0,0 +1,59 @@
+import random
+import sys
+import time
+from itertools import accumulate
+from typing import List
+
+from model import Cache
+from enums import EvictionPolicyType
+from exceptions import KeyNotFoundException
+
+
+def zipf_trace(length: int, key_space: int, skew: float = 0.99, seed: int = 7) -> List[int]:
+    rng = random.Random(seed)
+    weights = list(accumulate(1 / rank ** skew for rank in range(1, key_space + 1)))
+    return rng.choices(range(key_space), cum_weights=weights, k=length)
+
+
+def scan_trace(length: int, key_space: int, scan_length: int, scan_every: int, seed: int = 7) -> List[int]:
+    # Zipf traffic interrupted by one-off sequential scans over keys that are never requested again,
+    # which is the pattern that flushes the hot set out of a plain LRU.
+    trace = zipf_trace(length, key_space, seed=seed)
+    scanned = []
+    next_cold_key = key_space
+    for position, key in enumerate(trace):
+        if position % scan_every == 0:
+            scanned.extend(range(next_cold_key, next_cold_key + scan_length))
+            next_cold_key += scan_length
+        scanned.append(key)
+    return scanned
+
+
+def replay(trace: List[int], capacity: int, eviction_policy: EvictionPolicyType):
+    cache = Cache(capacity, eviction_policy)
+    hits = 0
+    start = time.perf_counter()
+    for key in trace:
+        try:
+            cache.get(key)
+            hits += 1
+        except KeyNotFoundException:
+            cache.put(key, key)
+    seconds = time.perf_counter() - start
+    return hits / len(trace), len(trace) / seconds
+
+
+if __name__ == "__main__":
+    length = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    key_space = length // 5
+    capacity = key_space // 20
+    traces = {
+        "zipf": zipf_trace(length, key_space),
+        "scan": scan_trace(length, key_space, scan_length=capacity * 2, scan_every=length // 20),
+    }
+    print(f"capacity {capacity:,}, key space {key_space:,}")
+    for trace_name, trace in traces.items():
+        print(f"{trace_name} trace, {len(trace):,} requests")
+        for eviction_policy in EvictionPolicyType:
+            hit_ratio, ops = replay(trace, capacity, eviction_policy)
+            print(f"  {eviction_policy.value:<10} hit ratio {hit_ratio:6.2%} | {ops:12,.0f} ops/s")
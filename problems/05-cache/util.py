@@ -1,45 +1,198 @@
+import sys
+
+
 class ListNode:
-    def __init__(self, value):
+    __slots__ = ("key", "val", "prev", "next", "tag", "expires_at", "weight")
+
+    def __init__(self, key=None, value=None):
+        self.key = key
         self.val = value
         self.prev = None
         self.next = None
+        # eviction policy bookkeeping: frequency for LFU, owning segment for ARC/W-TinyLFU
+        self.tag = None
+        self.expires_at = None
+        self.weight = 1
+
+
+def size_of(key, value) -> int:
+    # shallow sizes only: containers are weighed by their own header and slots, not their contents
+    return sys.getsizeof(key) + sys.getsizeof(value)
 
 
 class DoublyLinkedList:
+    __slots__ = ("head", "tail", "size")
 
     def __init__(self):
-        self.head = None
-        self.tail = None
+        # head and tail are sentinels, so attach/detach never branch on the ends
+        self.head = ListNode()
+        self.tail = ListNode()
+        self.head.next = self.tail
+        self.tail.prev = self.head
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def is_empty(self) -> bool:
+        return self.head.next is self.tail
+
+    def first(self):
+        return None if self.head.next is self.tail else self.head.next
+
+    def last(self):
+        return None if self.tail.prev is self.head else self.tail.prev
 
     def attach(self, node):
-        if self.head is None:
-            self.head = node
-            self.tail = node
-        else:
-            self.tail.next = node
-            node.prev = self.tail
-            self.tail = node
+        last = self.tail.prev
+        last.next = node
+        node.prev = last
+        node.next = self.tail
+        self.tail.prev = node
+        self.size += 1
+
+    def detach(self, node):
+        node.prev.next = node.next
+        node.next.prev = node.prev
+        node.prev = None
+        node.next = None
+        self.size -= 1
 
     def detach_first(self):
-        if self.head == self.tail:
-            self.head = None
-            self.tail = None
-        else:
-            self.head = self.head.next
+        node = self.head.next
+        self.detach(node)
+        return node
 
     def detach_last(self):
-        if self.head == self.tail:
-            self.head = None
-            self.tail = None
-        else:
-            self.tail.prev.next = None
-            self.tail = self.tail.prev
+        node = self.tail.prev
+        self.detach(node)
+        return node
 
-    def detach(self, node):
-        if self.head == node:
-            self.detach_first()
-        elif self.tail == node:
-            self.detach_last()
+    def move_to_end(self, node):
+        node.prev.next = node.next
+        node.next.prev = node.prev
+        last = self.tail.prev
+        last.next = node
+        node.prev = last
+        node.next = self.tail
+        self.tail.prev = node
+
+
+class CountMinSketch:
+    DEPTH = 4
+    MAX_COUNT = 15
+    MULTIPLIER = 0x9E3779B97F4A7C15F39CC0605CEDC835
+
+    def __init__(self, capacity: int):
+        self.bits = 4
+        while 1 << self.bits < capacity:
+            self.bits += 1
+        width = 1 << self.bits
+        self.mask = width - 1
+        # one flat table, row i occupies [i * width, (i + 1) * width)
+        self.table = [0] * (width * self.DEPTH)
+        self.additions = 0
+        self.sample_size = 10 * width
+
+    def indexes(self, key):
+        # a single wide multiply spreads the hash, each row then takes its own slice of the product bits
+        spread = (hash(key) * self.MULTIPLIER) >> 32
+        bits, mask = self.bits, self.mask
+        width = mask + 1
+        return (spread & mask,
+                width + ((spread >> bits) & mask),
+                2 * width + ((spread >> 2 * bits) & mask),
+                3 * width + ((spread >> 3 * bits) & mask))
+
+    def increment(self, key):
+        table = self.table
+        for index in self.indexes(key):
+            if table[index] < self.MAX_COUNT:
+                table[index] += 1
+        self.additions += 1
+        if self.additions >= self.sample_size:
+            self.reset()
+
+    def frequency(self, key) -> int:
+        table = self.table
+        a, b, c, d = self.indexes(key)
+        return min(table[a], table[b], table[c], table[d])
+
+    def reset(self):
+        # halving every counter ages out old popularity so the sketch follows shifts in the workload
+        self.table = [count >> 1 for count in self.table]
+        self.additions >>= 1
+
+
+class TimingWheel:
+    SLOT_BITS = 6
+    SLOT_MASK = (1 << SLOT_BITS) - 1
+
+    def __init__(self, tick: float, now: float, levels: int = 4):
+        if levels < 2:
+            # deadlines past the horizon are parked on the top level and re-placed when it cascades,
+            # level 0 never cascades so a single level would fire them early
+            raise Exception("A timing wheel needs at least 2 levels")
+        self.tick = tick
+        self.levels = levels
+        self.slots = [[[] for _ in range(1 << self.SLOT_BITS)] for _ in range(levels)]
+        self.current_tick = int(now / tick)
+        self.size = 0
+
+    def schedule(self, deadline: float, item):
+        deadline_tick = max(-int(-deadline // self.tick), self.current_tick + 1)
+        self.place(deadline_tick, (deadline, item))
+        self.size += 1
+
+    def place(self, deadline_tick: int, entry):
+        for level in range(self.levels):
+            shift = level * self.SLOT_BITS
+            if (deadline_tick >> shift) - (self.current_tick >> shift) <= self.SLOT_MASK:
+                break
         else:
-            node.prev.next = node.next
-            node.next.prev = node.prev
+            # beyond the wheel's horizon: park in the farthest top-level slot and re-place it on cascade
+            deadline_tick = ((self.current_tick >> shift) + self.SLOT_MASK) << shift
+        self.slots[level][(deadline_tick >> shift) & self.SLOT_MASK].append(entry)
+
+    def advance(self, now: float) -> list:
+        target_tick = int(now / self.tick)
+        expired = []
+        if self.size == 0:
+            self.current_tick = max(self.current_tick, target_tick)
+            return expired
+        while self.current_tick < target_tick:
+            next_tick = self.current_tick + 1
+            if next_tick & self.SLOT_MASK and not self.slots[0][next_tick & self.SLOT_MASK]:
+                # nothing fires on the next tick: jump to the next tick where a slot on some level is due
+                due_tick = self.next_due_tick()
+                next_tick = target_tick if due_tick is None else min(due_tick, target_tick)
+            self.current_tick = next_tick
+            for level in range(self.levels - 1, 0, -1):
+                shift = level * self.SLOT_BITS
+                if self.current_tick & ((1 << shift) - 1) == 0:
+                    self.cascade(level, (self.current_tick >> shift) & self.SLOT_MASK)
+            slot = self.slots[0][self.current_tick & self.SLOT_MASK]
+            if slot:
+                expired.extend(slot)
+                self.size -= len(slot)
+                slot.clear()
+        return expired
+
+    def next_due_tick(self) -> int:
+        due_tick = None
+        for level in range(self.levels):
+            shift = level * self.SLOT_BITS
+            block = self.current_tick >> shift
+            for index, slot in enumerate(self.slots[level]):
+                if slot:
+                    ahead = (index - block) & self.SLOT_MASK or self.SLOT_MASK + 1
+                    tick = (block + ahead) << shift
+                    if due_tick is None or tick < due_tick:
+                        due_tick = tick
+        return due_tick
+
+    def cascade(self, level: int, index: int):
+        entries = self.slots[level][index]
+        self.slots[level][index] = []
+        for entry in entries:
+            self.place(max(-int(-entry[0] // self.tick), self.current_tick), entry)
@@ -0,0 +1,59 @@
+import random
+import sys
+
+from model import Cache, LeastFrequentlyUsed
+from enums import EvictionPolicyType
+from exceptions import KeyNotFoundException
+
+WEIGHTED_POLICIES = (EvictionPolicyType.LRU, EvictionPolicyType.FIFO, EvictionPolicyType.LFU)
+
+
+def policy_size(cache: Cache) -> int:
+    eviction_policy = cache.eviction_policy
+    if isinstance(eviction_policy, LeastFrequentlyUsed):
+        return sum(len(bucket) for bucket in eviction_policy.buckets.values())
+    return len(eviction_policy.list)
+
+
+def check(cache: Cache, key, value, errors: list):
+    node = cache.storage.find(key)
+    if node is None or node.val != value:
+        errors.append(f"{key} was evicted by its own put")
+    weight = sum(node.weight for node in cache.storage.storage.values())
+    if weight != cache.storage.weight:
+        errors.append(f"tracked weight {cache.storage.weight}, entries weigh {weight}")
+    if weight > cache.capacity:
+        errors.append(f"weight {weight} is over the capacity {cache.capacity}")
+    if policy_size(cache) != len(cache.storage.storage):
+        errors.append(f"policy holds {policy_size(cache)} entries, storage {len(cache.storage.storage)}")
+
+
+def run(eviction_policy: EvictionPolicyType, operations: int, capacity: int, key_space: int, seed: int) -> list:
+    # mixed-weight inserts and rewrites, including rewrites that grow an entry past the free weight
+    rng = random.Random(seed)
+    cache = Cache(capacity, eviction_policy, weigher=lambda key, value: value)
+    errors = []
+    for _ in range(operations):
+        key = rng.randrange(key_space)
+        if rng.random() < 0.3:
+            try:
+                cache.get(key)
+            except KeyNotFoundException:
+                pass
+            continue
+        value = rng.randint(1, capacity)
+        cache.put(key, value)
+        check(cache, key, value, errors)
+        if errors:
+            break
+    return errors
+
+
+if __name__ == "__main__":
+    operations = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    failed = False
+    for eviction_policy in WEIGHTED_POLICIES:
+        errors = run(eviction_policy, operations, capacity=16, key_space=24, seed=7)
+        print(f"{eviction_policy.value:<5} {'ok' if not errors else errors[0]}")
+        failed = failed or bool(errors)
+    sys.exit(1 if failed else 0)
@@ -1,3 +1,4 @@
+import threading
 from enum import Enum
 from abc import ABC, abstractmethod
 from typing import List
@@ -76,11 +77,14 @@ class ActionButtonStrategy(ABC):
 
 class ActionElevatorButtonStrategy(ActionButtonStrategy):
     _instance = None
+    _lock = threading.Lock()
 
     @classmethod
     def get_instance(cls):
         if cls._instance is None:
-            cls()
+            with cls._lock:
+                if cls._instance is None:
+                    cls()
         return cls._instance
 
     def __init__(self):
@@ -94,11 +98,14 @@ class ActionElevatorButtonStrategy(ActionButtonStrategy):
 
 class ActionFloorButtonStrategy(ActionButtonStrategy):
     _instance = None
+    _lock = threading.Lock()
 
     @classmethod
     def get_instance(cls):
         if cls._instance is None:
-            cls()
+            with cls._lock:
+                if cls._instance is None:
+                    cls()
         return cls._instance
 
     def __init__(self):
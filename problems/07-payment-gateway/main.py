@@ -1,3 +1,4 @@
+import threading
 from random import randint
 from enums import CurrencyType, TransactionStatus, PaymentMethod
 from abc import ABC, abstractmethod
@@ -46,11 +47,14 @@ class TransactionValidationStrategy(ABC):
 
 class CashStrategy(TransactionValidationStrategy):
     _instance = None
+    _lock = threading.Lock()
 
     @classmethod
     def get_instance(cls):
         if cls._instance is None:
-            cls()
+            with cls._lock:
+                if cls._instance is None:
+                    cls()
         return cls._instance
 
     def __init__(self):
@@ -64,11 +68,14 @@ class CashStrategy(TransactionValidationStrategy):
 
 class OnlineStrategy(TransactionValidationStrategy):
     _instance = None
+    _lock = threading.Lock()
 
     @classmethod
     def get_instance(cls):
         if cls._instance is None:
-            cls()
+            with cls._lock:
+                if cls._instance is None:
+                    cls()
         return cls._instance
 
     def __init__(self):
@@ -1,3 +1,4 @@
+import threading
 from datetime import datetime
 from enum import Enum
 from abc import ABC
@@ -126,11 +127,14 @@ class Wall(TimelineWall):
 
 class ContentServer:
     _instance = None
+    _lock = threading.Lock()
 
     @classmethod
     def get_instance(cls):
         if cls._instance is None:
-            cls()
+            with cls._lock:
+                if cls._instance is None:
+                    cls()
         return cls._instance
 
     def __init__(self):